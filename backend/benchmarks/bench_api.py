@@ -0,0 +1,92 @@
+"""End-to-end API benchmark: every endpoint against one seeded server.
+
+Seeds `--worlds` complex worlds, then runs each phase with `--concurrency`
+connections and reports throughput and p50/p95/p99 latency:
+
+- generate_world: POST /generate-world
+- list_shallow: GET /worlds (first page)
+- list_deep_offset: GET /worlds?skip=... near the end of the table
+- list_deep_cursor: the same deep page through its keyset cursor
+- get_world: GET /worlds/{id} cycling over a hot set of seeded IDs
+  (response cache enabled; clients mostly re-read the same few worlds)
+- get_world_uncached: the same against a server with WORLD_CACHE_SIZE=0
+- delete_world: DELETE /worlds/{id}, each seeded ID once
+
+Usage (from the backend directory):
+    python benchmarks/bench_api.py --worlds 2000 --requests 2000 --concurrency 8
+"""
+import argparse
+import json
+
+from common import Client, request, run_concurrent, running_server
+
+SEED_BATCH = 500
+HOT_IDS = 100
+
+
+def seed(port: int, worlds: int) -> list:
+    client = Client(port)
+    ids = []
+    try:
+        for offset in range(0, worlds, SEED_BATCH):
+            batch = [{"theme": f"api benchmark world {i}", "complexity": "complex"}
+                     for i in range(offset, min(worlds, offset + SEED_BATCH))]
+            status, body = request(client, "POST", "/generate-worlds", batch)
+            assert status == 201, status
+            ids.extend(json.loads(body)["ids"])
+    finally:
+        client.close()
+    return ids
+
+
+def deep_cursor(port: int, skip: int, limit: int) -> str:
+    """X-Next-Cursor of the page ending just before offset `skip`."""
+    client = Client(port)
+    try:
+        client.conn.request("GET", f"/worlds?skip={skip - limit}&limit={limit}")
+        response = client.conn.getresponse()
+        response.read()
+        return response.getheader("X-Next-Cursor")
+    finally:
+        client.close()
+
+
+def run(worlds: int, requests: int, concurrency: int, limit: int) -> dict:
+    assert worlds >= max(HOT_IDS, 2 * limit), "seed more worlds than the hot set and two pages"
+    results = {}
+    deep = max(limit, worlds - limit)
+    with running_server() as port:
+        ids = seed(port, worlds)
+        cursor = deep_cursor(port, deep, limit)
+        phases = {
+            "generate_world": [("POST", "/generate-world", {"theme": f"api benchmark new world {i}"}, 201)
+                               for i in range(requests)],
+            "list_shallow": [("GET", f"/worlds?limit={limit}", None, 200)] * requests,
+            "list_deep_offset": [("GET", f"/worlds?skip={deep}&limit={limit}", None, 200)] * requests,
+            "list_deep_cursor": [("GET", f"/worlds?cursor={cursor}&limit={limit}", None, 200)] * requests,
+            "get_world": [("GET", f"/worlds/{ids[i % HOT_IDS]}", None, 200) for i in range(requests)],
+        }
+        for name, calls in phases.items():
+            results[name] = run_concurrent(port, calls, concurrency)
+        deletes = [("DELETE", f"/worlds/{world_id}", None, 204) for world_id in ids[:requests]]
+        results["delete_world"] = run_concurrent(port, deletes, concurrency)
+
+    with running_server({"WORLD_CACHE_SIZE": "0"}) as port:
+        ids = seed(port, worlds)
+        calls = [("GET", f"/worlds/{ids[i % HOT_IDS]}", None, 200) for i in range(requests)]
+        results["get_world_uncached"] = run_concurrent(port, calls, concurrency)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--worlds", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.worlds, args.requests, args.concurrency, args.limit), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare worlds/second for POST /generate-world versus POST /generate-worlds.
+
+Usage (from the backend directory):
+    python benchmarks/bench_batch.py --worlds 2000 --batch-size 500
+"""
+import argparse
+import json
+import time
+
+from common import Client, request, running_server, summarize
+
+
+def story_request(i: int) -> dict:
+    genres = ("fantasy", "sci-fi", "steampunk")
+    complexities = ("simple", "medium", "complex")
+    return {
+        "theme": f"benchmark world number {i}",
+        "genre": genres[i % 3],
+        "complexity": complexities[i % 3],
+    }
+
+
+def bench_single(port: int, worlds: int) -> dict:
+    client = Client(port)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(worlds):
+        t0 = time.perf_counter()
+        status, _ = request(client, "POST", "/generate-world", story_request(i))
+        latencies.append(time.perf_counter() - t0)
+        assert status == 201, status
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def bench_batch(port: int, worlds: int, batch_size: int) -> dict:
+    client = Client(port)
+    latencies = []
+    start = time.perf_counter()
+    for offset in range(0, worlds, batch_size):
+        payload = [story_request(i) for i in range(offset, min(worlds, offset + batch_size))]
+        t0 = time.perf_counter()
+        status, body = request(client, "POST", "/generate-worlds", payload)
+        latencies.append(time.perf_counter() - t0)
+        assert status == 201, (status, body[:200])
+    return summarize(latencies, time.perf_counter() - start, items=worlds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--worlds", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with running_server() as port:
+        single = bench_single(port, args.worlds)
+        batch = bench_batch(port, args.worlds, args.batch_size)
+
+    print(json.dumps({
+        "single": single,
+        "batch": batch,
+        "speedup": round(batch["items_per_s"] / single["items_per_s"], 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
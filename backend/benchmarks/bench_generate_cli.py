@@ -0,0 +1,52 @@
+"""Throughput of `python main.py generate` at several worker counts.
+
+Each run generates `--worlds` worlds into a fresh temporary database and
+reports worlds/s, wall time, and the speedup over the first worker count. Worker
+processes only generate and write their own shards, so the speedup should
+track the number of CPU cores until the single-process merge becomes the
+bottleneck.
+
+Usage (from the backend directory):
+    python benchmarks/bench_generate_cli.py --worlds 20000 --workers 1 2 4 [--engine numpy]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import BACKEND_DIR
+
+
+def run(worlds: int, workers: int, complexity: str, engine: str = "python") -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/bench.db", LOG_FILE="")
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, os.path.join(BACKEND_DIR, "main.py"), "generate", str(worlds),
+             "--workers", str(workers), "--complexity", complexity, "--seed", "0", "--engine", engine],
+            cwd=tmp, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        elapsed = time.perf_counter() - start
+    return {"elapsed_s": round(elapsed, 3), "items_per_s": round(worlds / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--worlds", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--complexity", default="complex")
+    parser.add_argument("--engine", choices=("python", "numpy"), default="python")
+    args = parser.parse_args()
+
+    results = {str(workers): run(args.worlds, workers, args.complexity, args.engine) for workers in args.workers}
+    baseline = results[str(args.workers[0])]["items_per_s"]
+    for result in results.values():
+        result["speedup"] = round(result["items_per_s"] / baseline, 2)
+    print(json.dumps({"cpu_count": os.cpu_count(), "worlds": args.worlds, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""In-process microbenchmark of world generation (no HTTP, no database).
+
+Reports the mean cost of each generator function and of a full
+build_storyworld() call per complexity level, in microseconds.
+
+The "pipeline" section compares generating and serializing a world through
+the internal dataclasses against a reconstruction of the previous pydantic
+path (Character/Location models, StoryWorld built twice, model_dump() before
+encoding), both in time and in peak traced memory per world.
+
+Usage (from the backend directory):
+    python benchmarks/bench_generators.py --repeat 2000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import timeit
+import tracemalloc
+from dataclasses import asdict
+
+# Keep the import of main away from the developer's database and log file
+os.chdir(tempfile.mkdtemp())
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import common  # noqa: E402,F401  (puts the backend directory on sys.path)
+import main  # noqa: E402
+
+
+def per_call_us(func, repeat: int) -> float:
+    return round(min(timeit.repeat(func, number=repeat, repeat=3)) / repeat * 1e6, 3)
+
+
+def generator_cases(genre: str):
+    rng = random.Random(0)
+    characters = main.generate_characters(4, genre, rng)
+    world = main.build_storyworld(main.StoryRequest(theme="benchmark theme", genre=genre, complexity="medium", seed=1))
+    return {
+        "generate_world_name": lambda: main.generate_world_name(genre, rng),
+        "generate_characters": lambda: main.generate_characters(6, genre, rng),
+        "generate_locations": lambda: main.generate_locations(genre, 4),
+        "generate_story_arc": lambda: main.generate_story_arc("benchmark theme", genre, "medium"),
+        "generate_dialogues": lambda: main.generate_dialogues(characters, 2, rng),
+        "generate_art_prompts": lambda: main.generate_art_prompts(world, genre, 8),
+    }
+
+
+def dataclass_pipeline(story_request) -> bytes:
+    return main.storyworld_to_row(main.build_storyworld(story_request))["document"]
+
+
+def pydantic_pipeline(story_request) -> bytes:
+    """The pre-dataclass path: models per generator, two StoryWorld validations, model_dump()."""
+    world = main.build_storyworld(story_request)
+    characters = [main.Character(**asdict(char)) for char in world.characters]
+    locations = [main.Location(**asdict(loc)) for loc in world.locations]
+    fields = dict(
+        title=world.title, summary=world.summary, theme=world.theme, genre=world.genre,
+        complexity=world.complexity, characters=characters, locations=locations,
+        story_arc=world.story_arc, dialogues=world.dialogues
+    )
+    main.StoryWorld(**fields, art_prompts=[])
+    final = main.StoryWorld(**fields, art_prompts=world.art_prompts)
+    return main.orjson.dumps({
+        "title": final.title, "summary": final.summary, "theme": final.theme,
+        "genre": final.genre, "complexity": final.complexity,
+        "characters": [char.model_dump() for char in final.characters],
+        "locations": [loc.model_dump() for loc in final.locations],
+        "story_arc": final.story_arc, "dialogues": final.dialogues, "art_prompts": final.art_prompts
+    })
+
+
+def peak_bytes(func, repeat: int) -> int:
+    """Mean peak traced memory of a single call."""
+    total = 0
+    tracemalloc.start()
+    for _ in range(repeat):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        func()
+        total += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return total // repeat
+
+
+def run(repeat: int) -> dict:
+    results = {"generators": {}, "build_storyworld": {}, "pipeline": {}}
+    for name, func in generator_cases("fantasy").items():
+        results["generators"][name] = per_call_us(func, repeat)
+    for complexity in ("simple", "medium", "complex", "epic"):
+        story_request = main.StoryRequest(theme="benchmark theme", genre="sci-fi", complexity=complexity)
+        results["build_storyworld"][complexity] = per_call_us(lambda: main.build_storyworld(story_request), repeat)
+    story_request = main.StoryRequest(theme="benchmark theme", genre="fantasy", complexity="complex", seed=1)
+    for name, pipeline in (("dataclass", dataclass_pipeline), ("pydantic_reference", pydantic_pipeline)):
+        results["pipeline"][name] = {
+            "us_per_world": per_call_us(lambda: pipeline(story_request), repeat),
+            "peak_bytes_per_world": peak_bytes(lambda: pipeline(story_request), min(repeat, 500)),
+        }
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps({"unit": "us_per_call", **run(args.repeat)}, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,154 @@
+"""Serialization CPU and bytes on the wire for GET /worlds and GET /worlds/{id}.
+
+In-process (no HTTP, no database), for one complex world ("detail") and a
+page of `--limit` complex worlds ("list"), reports microseconds per
+response for:
+
+- pydantic_json: validate through the response model, then encode with the
+  stdlib json module (FastAPI's default response path)
+- pydantic_orjson: the same model dump encoded with orjson (ORJSONResponse)
+- stored_document: splicing the stored orjson documents, which is what both
+  endpoints send
+- gzip / br: compressing that body at GZIP_LEVEL / BROTLI_QUALITY
+
+plus the body size for each encoding. Then, against a server seeded with
+`--worlds` complex worlds, it times `--requests` list pages and detail
+reads for each Accept-Encoding. It reports latency, throughput and the
+average body bytes on the wire. Detail reads cycle over a hot set of IDs,
+so compressed bodies mostly come from the compressed-body cache.
+
+Usage (from the backend directory):
+    python benchmarks/bench_serialization.py --worlds 500 --requests 500 --limit 100
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import timeit
+import zlib
+from dataclasses import asdict
+from typing import List
+
+# Read no .env from the developer's working directory
+os.chdir(tempfile.mkdtemp())
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import orjson  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from common import Client, request, running_server, summarize  # noqa: E402
+import main  # noqa: E402
+
+ENCODINGS = ("identity", "gzip", "br")
+HOT_IDS = 100
+SEED_BATCH = 500
+
+
+def best_us(func, number: int) -> float:
+    return round(min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6, 1)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return zlib.compress(body, main.settings.gzip_level, wbits=31)
+    if encoding == "br":
+        return main.brotli.compress(body, quality=main.settings.brotli_quality)
+    return body
+
+
+def cpu_case(worlds: list, number: int) -> dict:
+    rows = [main.StoryWorldDB(**main.storyworld_to_row(world)) for world in worlds]
+    data = [asdict(world) for world in worlds]
+    adapter = TypeAdapter(List[main.StoryWorld])
+
+    def pydantic_json():
+        content = adapter.dump_python(adapter.validate_python(data), mode="json")
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+    def pydantic_orjson():
+        return orjson.dumps(adapter.dump_python(adapter.validate_python(data), mode="json"))
+
+    body = main.storyworlds_json(rows)
+    result = {
+        "pydantic_json_us": best_us(pydantic_json, number),
+        "pydantic_orjson_us": best_us(pydantic_orjson, number),
+        "stored_document_us": best_us(lambda: main.storyworlds_json(rows), number),
+    }
+    encodings = [e for e in ENCODINGS if e != "br" or main.brotli is not None]
+    for encoding in encodings[1:]:
+        result[f"{encoding}_us"] = best_us(lambda: compress(body, encoding), number)
+    result["bytes"] = {encoding: len(compress(body, encoding)) for encoding in encodings}
+    return result
+
+
+def run_cpu(limit: int, repeat: int) -> dict:
+    worlds = []
+    for i in range(limit):
+        world = main.build_storyworld(main.StoryRequest(theme=f"serialization benchmark {i}", complexity="complex", seed=i))
+        world.id = i + 1
+        worlds.append(world)
+    return {
+        "detail": cpu_case(worlds[:1], repeat),
+        "list": cpu_case(worlds, max(1, repeat // limit)),
+    }
+
+
+def seed(client: Client, worlds: int) -> list:
+    ids = []
+    for offset in range(0, worlds, SEED_BATCH):
+        batch = [{"theme": f"serialization benchmark {i}", "complexity": "complex"}
+                 for i in range(offset, min(worlds, offset + SEED_BATCH))]
+        status, body = request(client, "POST", "/generate-worlds", batch)
+        assert status == 201, status
+        ids.extend(json.loads(body)["ids"])
+    return ids
+
+
+def timed_reads(client: Client, paths: list, encoding: str) -> dict:
+    latencies, size = [], 0
+    start = time.perf_counter()
+    for path in paths:
+        t0 = time.perf_counter()
+        status, body = request(client, "GET", path, headers={"Accept-Encoding": encoding})
+        latencies.append(time.perf_counter() - t0)
+        assert status == 200, (path, status)
+        size += len(body)
+    result = summarize(latencies, time.perf_counter() - start)
+    result["bytes"] = round(size / len(paths))
+    return result
+
+
+def run_http(worlds: int, requests: int, limit: int) -> dict:
+    assert worlds >= max(HOT_IDS, limit), "seed at least one page and the hot set"
+    results = {"list": {}, "detail": {}}
+    with running_server() as port:
+        client = Client(port)
+        try:
+            ids = seed(client, worlds)
+            pages = [f"/worlds?skip={(i * limit) % (worlds - limit + 1)}&limit={limit}" for i in range(requests)]
+            details = [f"/worlds/{ids[i % HOT_IDS]}" for i in range(requests)]
+            for encoding in ENCODINGS:
+                results["list"][encoding] = timed_reads(client, pages, encoding)
+                results["detail"][encoding] = timed_reads(client, details, encoding)
+        finally:
+            client.close()
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--worlds", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000, help="Detail encodings per CPU timing (list: repeat / limit)")
+    args = parser.parse_args()
+    print(json.dumps({
+        "brotli": main.brotli is not None,
+        "cpu": run_cpu(args.limit, args.repeat),
+        "http": run_http(args.worlds, args.requests, args.limit),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
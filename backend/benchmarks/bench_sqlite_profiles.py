@@ -0,0 +1,106 @@
+"""Insert and read throughput under each SQLITE_PROFILE.
+
+For every profile a fresh server and database are started, then:
+
+- single_insert: sequential POST /generate-world (one commit per world)
+- batch_insert: POST /generate-worlds in batches (one commit per batch)
+- point_reads: concurrent GET /worlds/{id} with the response cache disabled
+- page_reads: concurrent GET /worlds?limit=100
+
+Usage (from the backend directory):
+    python benchmarks/bench_sqlite_profiles.py --worlds 500 --reads 4000
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import Client, request, running_server, summarize
+
+PROFILES = ("default", "durable", "tuned")
+BATCH_SIZE = 100
+
+
+def single_insert(port: int, count: int) -> dict:
+    client = Client(port)
+    latencies = []
+    start = time.perf_counter()
+    try:
+        for i in range(count):
+            t0 = time.perf_counter()
+            status, _ = request(client, "POST", "/generate-world", {"theme": f"profile world {i}"})
+            assert status == 201, status
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        client.close()
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def batch_insert(port: int, count: int) -> dict:
+    client = Client(port)
+    latencies = []
+    start = time.perf_counter()
+    try:
+        for offset in range(0, count, BATCH_SIZE):
+            batch = [{"theme": f"batch world {offset + i}"} for i in range(min(BATCH_SIZE, count - offset))]
+            t0 = time.perf_counter()
+            status, _ = request(client, "POST", "/generate-worlds", batch)
+            assert status == 201, status
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        client.close()
+    return summarize(latencies, time.perf_counter() - start, items=count)
+
+
+def concurrent_reads(port: int, paths: list, concurrency: int) -> dict:
+    latencies, lock = [], threading.Lock()
+
+    def worker(chunk):
+        client = Client(port)
+        local = []
+        try:
+            for path in chunk:
+                t0 = time.perf_counter()
+                status, _ = request(client, "GET", path)
+                assert status == 200, status
+                local.append(time.perf_counter() - t0)
+        finally:
+            client.close()
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker, paths[w::concurrency]) for w in range(concurrency)]:
+            future.result()
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def run_profile(profile: str, worlds: int, reads: int, concurrency: int) -> dict:
+    with running_server({"SQLITE_PROFILE": profile, "WORLD_CACHE_SIZE": "0"}) as port:
+        results = {
+            "single_insert": single_insert(port, worlds),
+            "batch_insert": batch_insert(port, worlds * 4),
+        }
+        total = worlds * 5
+        results["point_reads"] = concurrent_reads(port, [f"/worlds/{i % total + 1}" for i in range(reads)], concurrency)
+        results["page_reads"] = concurrent_reads(
+            port, [f"/worlds?limit=100&skip={(i * 100) % total}" for i in range(reads // 10)], concurrency)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--worlds", type=int, default=500)
+    parser.add_argument("--reads", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES))
+    args = parser.parse_args()
+
+    print(json.dumps({profile: run_profile(profile, args.worlds, args.reads, args.concurrency)
+                      for profile in args.profiles}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
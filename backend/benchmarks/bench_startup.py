@@ -0,0 +1,116 @@
+"""Cold-start time of a worker process, checked against a time budget.
+
+Every run starts a fresh interpreter in an empty temporary directory and
+reports the median over `--runs` of:
+
+- python_s: `python -c pass`, the floor for any worker
+- import_s: `import main` (must create no files and open no database)
+- ready_s: `uvicorn main:app` until GET /health first answers 200, against a
+  database already brought up to date by `python main.py migrate`
+- migrate_s: `python main.py migrate` on an empty database (a deploy step,
+  not part of a worker's start)
+
+Exits with status 1 if the median ready_s is over `--budget` seconds or if
+importing main left any files behind, so it can gate autoscaling changes.
+
+Usage (from the backend directory):
+    python benchmarks/bench_startup.py --runs 5 --budget 2.0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import BACKEND_DIR, Client, free_port, request
+
+IMPORT_MAIN = (
+    "import sys, time; sys.path.insert(0, sys.argv[1]); start = time.perf_counter(); "
+    "import main; print(time.perf_counter() - start)"
+)
+
+
+def python_s(env: dict, cwd: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], cwd=cwd, env=env, check=True)
+    return time.perf_counter() - start
+
+
+def import_s(env: dict, cwd: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", IMPORT_MAIN, BACKEND_DIR], cwd=cwd, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def migrate_s(env: dict, cwd: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(BACKEND_DIR, "main.py"), "migrate"], cwd=cwd, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def ready_s(env: dict, cwd: str, timeout: float = 30.0) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR,
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            try:
+                client = Client(port)
+                status, _ = request(client, "GET", "/health")
+                client.close()
+                if status == 200:
+                    return time.perf_counter() - start
+            except OSError:
+                pass
+            if proc.poll() is not None or time.perf_counter() - start > timeout:
+                raise RuntimeError("server failed to start")
+            time.sleep(0.005)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def run(runs: int) -> dict:
+    samples = {"python_s": [], "import_s": [], "ready_s": [], "migrate_s": []}
+    leftovers = set()
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/bench.db", AUTO_MIGRATE="false")
+            samples["python_s"].append(python_s(env, tmp))
+            samples["import_s"].append(import_s(env, tmp))
+            leftovers.update(os.listdir(tmp))
+            samples["migrate_s"].append(migrate_s(env, tmp))
+            samples["ready_s"].append(ready_s(env, tmp))
+    results = {name: round(statistics.median(values), 3) for name, values in samples.items()}
+    results["import_created_files"] = sorted(leftovers)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=2.0, help="Maximum median ready_s in seconds")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    results["budget_s"] = args.budget
+    print(json.dumps(results, indent=2))
+    if results["import_created_files"]:
+        print(f"importing main created {', '.join(results['import_created_files'])}", file=sys.stderr)
+        sys.exit(1)
+    if results["ready_s"] > args.budget:
+        print(f"cold start {results['ready_s']}s is over the {args.budget}s budget", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
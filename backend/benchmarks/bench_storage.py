@@ -0,0 +1,82 @@
+"""Measure database size and GET /worlds list pages for each STORAGE_MODE.
+
+Seeds complex worlds through POST /generate-worlds, then times full pages
+of `limit` worlds for the single-document, compact (template indices) and
+legacy column layouts. Also reports the database file size and the stored
+payload bytes per world.
+
+Usage (from the backend directory):
+    python benchmarks/bench_storage.py --worlds 1000 --pages 200 --limit 100
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+from common import Client, request, running_server, summarize
+
+
+PAYLOAD_SQL = """
+    SELECT AVG(COALESCE(LENGTH(document), 0) + COALESCE(LENGTH(characters), 0) + COALESCE(LENGTH(locations), 0)
+               + COALESCE(LENGTH(story_arc), 0) + COALESCE(LENGTH(dialogues), 0) + COALESCE(LENGTH(art_prompts), 0))
+    FROM storyworlds
+"""
+
+
+def storage_size(path: str) -> dict:
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return {
+            "db_bytes": os.path.getsize(path),
+            "payload_bytes_per_world": round(conn.execute(PAYLOAD_SQL).fetchone()[0], 1),
+        }
+    finally:
+        conn.close()
+
+
+def run_mode(mode: str, worlds: int, pages: int, limit: int) -> dict:
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "storage.db")
+    with running_server({"STORAGE_MODE": mode, "DATABASE_URL": f"sqlite:///{path}"}) as port:
+        client = Client(port)
+        for offset in range(0, worlds, 500):
+            batch = [{"theme": f"storage benchmark {i}", "complexity": "complex"}
+                     for i in range(offset, min(worlds, offset + 500))]
+            status, _ = request(client, "POST", "/generate-worlds", batch)
+            assert status == 201, status
+        sizes = storage_size(path)
+
+        latencies, size = [], 0
+        start = time.perf_counter()
+        for page in range(pages):
+            skip = (page * limit) % max(1, worlds - limit)
+            t0 = time.perf_counter()
+            status, body = request(client, "GET", f"/worlds?skip={skip}&limit={limit}")
+            latencies.append(time.perf_counter() - t0)
+            assert status == 200, status
+            size = len(body)
+        client.close()
+        result = summarize(latencies, time.perf_counter() - start)
+        result["page_bytes"] = size
+        result.update(sizes)
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--worlds", type=int, default=1000)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    print(json.dumps({
+        mode: run_mode(mode, args.worlds, args.pages, args.limit)
+        for mode in ("columns", "document", "compact")
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
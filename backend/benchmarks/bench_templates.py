@@ -0,0 +1,75 @@
+"""Template pack load time and per-request cost as the number of genres grows.
+
+For each genre count, writes that many synthetic JSON packs (with
+`--names` first and last names each) to a temporary directory, then
+reports:
+
+- load_ms: compiling the whole directory into a TemplateRegistry
+- reload_check_us: one hot-reload poll when nothing changed
+- build_storyworld_us: a complex world for one genre of the registry
+
+Per-request cost should stay flat as genres and name pools grow.
+
+Usage (from the backend directory):
+    python benchmarks/bench_templates.py --genres 3 100 500 --names 10000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import timeit
+
+# Keep the import of main away from the developer's database and log file
+os.chdir(tempfile.mkdtemp())
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import common  # noqa: E402,F401  (puts the backend directory on sys.path)
+import main  # noqa: E402
+
+
+def write_packs(directory: str, genres: int, names: int) -> None:
+    for g in range(genres):
+        pack = {
+            "genre": f"genre-{g}",
+            "first_names": [f"First{g}x{i}" for i in range(names)],
+            "last_names": [f"Last{g}x{i}" for i in range(names)],
+            "world_names": [f"World{g}x{i}" for i in range(100)],
+            "settings": [f"setting {g}/{i}" for i in range(50)],
+            "conflicts": [f"conflict {g}/{i}" for i in range(50)],
+            "locations": [{"name": f"Place {g}/{i}", "description": "A place", "type": "city"} for i in range(8)],
+            "story_arc": {"title": f"Arc {g}", "phases": [f"Phase {i}" for i in range(5)]},
+        }
+        with open(os.path.join(directory, f"genre-{g}.json"), "w") as file:
+            json.dump(pack, file)
+
+
+def run_count(genres: int, names: int, repeat: int) -> dict:
+    directory = tempfile.mkdtemp()
+    write_packs(directory, genres, names)
+    registry = main.TemplateRegistry(directory)
+    start = time.perf_counter()
+    registry.load()
+    load_ms = (time.perf_counter() - start) * 1e3
+
+    main.template_registry = registry
+    story_request = main.StoryRequest(theme="benchmark theme", genre=f"genre-{genres // 2}", complexity="complex")
+    return {
+        "load_ms": round(load_ms, 2),
+        "reload_check_us": round(min(timeit.repeat(registry.reload_if_changed, number=20, repeat=3)) / 20 * 1e6, 1),
+        "build_storyworld_us": round(
+            min(timeit.repeat(lambda: main.build_storyworld(story_request), number=repeat, repeat=3)) / repeat * 1e6, 2),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--genres", type=int, nargs="+", default=[3, 100, 500])
+    parser.add_argument("--names", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps({str(count): run_count(count, args.names, args.repeat) for count in args.genres}, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
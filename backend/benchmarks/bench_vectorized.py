@@ -0,0 +1,64 @@
+"""Per-call build_storyworld vs the vectorized NumPy batch engine.
+
+Builds K complex worlds (no HTTP, no database) both ways and reports the
+best-of-3 time in microseconds per world, plus the speedup. The vectorized
+engine draws every random index for the batch as NumPy arrays first, so its
+fixed per-batch overhead only pays off once K is large enough.
+
+Usage (from the backend directory):
+    python benchmarks/bench_vectorized.py --k 1 100 100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+# Keep the import of main away from the developer's database and log file
+os.chdir(tempfile.mkdtemp())
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import common  # noqa: E402,F401  (puts the backend directory on sys.path)
+import main  # noqa: E402
+
+
+def best_us_per_world(func, k: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return round(best / k * 1e6, 3)
+
+
+def run(sizes, genre: str, complexity: str) -> dict:
+    if main.load_numpy() is None:
+        raise SystemExit("numpy is not installed")
+    results = {}
+    for k in sizes:
+        story_requests = [main.StoryRequest(theme=f"benchmark theme {i}", genre=genre, complexity=complexity)
+                          for i in range(k)]
+        # Enough repeats for stable small-K numbers without making K=100k slow
+        repeat = max(3, min(1000, 100000 // k))
+        per_call = best_us_per_world(lambda: [main.build_storyworld(r) for r in story_requests], k, repeat)
+        vectorized = best_us_per_world(lambda: main.build_storyworlds_vectorized(story_requests), k, repeat)
+        results[str(k)] = {
+            "per_call_us_per_world": per_call,
+            "vectorized_us_per_world": vectorized,
+            "speedup": round(per_call / vectorized, 2),
+        }
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 100, 100000])
+    parser.add_argument("--genre", default="fantasy")
+    parser.add_argument("--complexity", default="complex")
+    args = parser.parse_args()
+    results = run(args.k, args.genre, args.complexity)
+    print(json.dumps({"numpy": main.np.__version__, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,97 @@
+"""Throughput of `python main.py serve` at several WORKERS counts.
+
+For each worker count the server is started through the CLI (so migrations
+run once in the parent and the limiter uses the shared SQLite store) and
+driven with a concurrent mix of POST /generate-world and GET /worlds/{id}.
+
+A second check starts each configuration with RATE_LIMIT=50/minute and
+fires more POSTs than that over many connections: with a shared store the
+number of accepted requests stays at 50 regardless of the worker count.
+
+Throughput only scales up to the number of CPU cores on the machine.
+
+Usage (from the backend directory):
+    python benchmarks/bench_workers.py --requests 2000 --concurrency 32 --workers 1 2 4
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import Client, request, running_server, summarize
+
+SEED_WORLDS = 200
+RATE_LIMIT = 50
+
+
+def worker(port: int, count: int, offset: int, latencies: list, lock: threading.Lock):
+    client = Client(port)
+    local = []
+    try:
+        for i in range(count):
+            n = offset + i
+            t0 = time.perf_counter()
+            if n % 4 == 0:
+                status, _ = request(client, "POST", "/generate-world",
+                                    {"theme": f"worker test world {n}", "complexity": "complex"})
+                assert status == 201, status
+            else:
+                status, _ = request(client, "GET", f"/worlds/{n % SEED_WORLDS + 1}")
+                assert status == 200, status
+            local.append(time.perf_counter() - t0)
+    finally:
+        client.close()
+    with lock:
+        latencies.extend(local)
+
+
+def run_throughput(workers: int, total: int, concurrency: int) -> dict:
+    with running_server({"WORKERS": str(workers)}, cli=True) as port:
+        client = Client(port)
+        status, _ = request(client, "POST", "/generate-worlds",
+                            [{"theme": f"seed world {i}"} for i in range(SEED_WORLDS)])
+        client.close()
+        assert status == 201, status
+        latencies, lock = [], threading.Lock()
+        per_worker = max(1, total // concurrency)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(worker, port, per_worker, w * per_worker, latencies, lock)
+                       for w in range(concurrency)]
+            for future in futures:
+                future.result()
+        return summarize(latencies, time.perf_counter() - start)
+
+
+def accepted_under_limit(workers: int, attempts: int) -> int:
+    def post(port: int) -> int:
+        client = Client(port)
+        try:
+            return request(client, "POST", "/generate-world", {"theme": "rate limit check"})[0]
+        finally:
+            client.close()
+
+    with running_server({"WORKERS": str(workers), "RATE_LIMIT": f"{RATE_LIMIT}/minute"}, cli=True) as port:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            statuses = list(pool.map(lambda _: post(port), range(attempts)))
+    return statuses.count(201)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    print(json.dumps({
+        "cpu_count": os.cpu_count(),
+        "throughput": {str(w): run_throughput(w, args.requests, args.concurrency) for w in args.workers},
+        "accepted_with_limit_%d" % RATE_LIMIT: {str(w): accepted_under_limit(w, RATE_LIMIT * 3) for w in args.workers},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
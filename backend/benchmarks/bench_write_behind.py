@@ -0,0 +1,77 @@
+"""POST /generate-world latency with synchronous writes vs the write-behind queue.
+
+Starts the server with WRITE_BEHIND=false and WRITE_BEHIND=true and drives
+the same number of concurrent POST /generate-world requests at each
+concurrency level, then reports p50/p95/p99 latency and worlds/s. After the
+write-behind run it checks that every returned world is readable.
+
+Usage (from the backend directory):
+    python benchmarks/bench_write_behind.py --requests 1200 --concurrency 1 8 32
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import Client, request, running_server, summarize
+
+
+def worker(port: int, count: int, offset: int, latencies: list, ids: list, lock: threading.Lock):
+    client = Client(port)
+    local, local_ids = [], []
+    try:
+        for i in range(count):
+            t0 = time.perf_counter()
+            status, body = request(client, "POST", "/generate-world",
+                                   {"theme": f"write behind world {offset + i}", "complexity": "complex"})
+            local.append(time.perf_counter() - t0)
+            assert status == 201, status
+            local_ids.append(json.loads(body)["id"])
+    finally:
+        client.close()
+    with lock:
+        latencies.extend(local)
+        ids.extend(local_ids)
+
+
+def run_level(port: int, total: int, concurrency: int) -> tuple:
+    latencies, ids, lock = [], [], threading.Lock()
+    per_worker = max(1, total // concurrency)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(worker, port, per_worker, w * per_worker, latencies, ids, lock)
+                   for w in range(concurrency)]
+        for future in futures:
+            future.result()
+    return summarize(latencies, time.perf_counter() - start), ids
+
+
+def run_mode(write_behind: bool, total: int, levels) -> dict:
+    results = {}
+    with running_server({"WRITE_BEHIND": str(write_behind).lower()}) as port:
+        for level in levels:
+            results[str(level)], ids = run_level(port, total, level)
+        client = Client(port)
+        try:
+            missing = sum(request(client, "GET", f"/worlds/{world_id}")[0] != 200 for world_id in ids)
+        finally:
+            client.close()
+        assert missing == 0, f"{missing} returned worlds were not readable"
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    print(json.dumps({
+        "synchronous": run_mode(False, args.requests, args.concurrency),
+        "write_behind": run_mode(True, args.requests, args.concurrency),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Upgrade a database created by the original schema through every migration.
+
+Builds a SQLite file with the `storyworlds` table exactly as the first
+release created it (per-field JSON columns, no `document`, no migrations
+table) and `--worlds` rows, then runs `python main.py migrate` on it and
+checks that:
+
+- every migration is recorded in schema_migrations
+- every row is in the search index and in storyworld_counts
+- the ID allocator starts after the highest existing ID
+- `python main.py export` still returns every stored world
+
+A migration must only read the columns that exist at its point in the
+sequence, never the current model. Exits with status 1 if the upgrade or
+any check fails.
+
+Usage (from the backend directory):
+    python benchmarks/check_migrations.py --worlds 50
+"""
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+from common import BACKEND_DIR
+
+# The storyworlds table as created by the first release, before any migration
+BASELINE_SCHEMA = """
+CREATE TABLE storyworlds (
+    id INTEGER NOT NULL,
+    title VARCHAR,
+    summary TEXT,
+    theme VARCHAR,
+    genre VARCHAR,
+    complexity VARCHAR,
+    characters TEXT,
+    locations TEXT,
+    story_arc TEXT,
+    dialogues TEXT,
+    art_prompts TEXT,
+    created_at DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE INDEX ix_storyworlds_id ON storyworlds (id);
+CREATE INDEX ix_storyworlds_title ON storyworlds (title);
+"""
+
+GENRES = ("fantasy", "sci-fi", "mystery")
+COMPLEXITIES = ("simple", "medium", "complex")
+
+
+def baseline_row(i: int) -> tuple:
+    return (
+        i + 1,
+        f"Legacy World {i}",
+        f"A world stored before migrations existed ({i})",
+        f"legacy theme {i}",
+        GENRES[i % len(GENRES)],
+        COMPLEXITIES[i % len(COMPLEXITIES)],
+        json.dumps([{"name": f"Hero{i}", "role": "protagonist", "description": "", "motivation": "", "backstory": ""}]),
+        json.dumps([{"name": f"Keep{i}", "type": "castle", "description": "", "significance": ""}]),
+        json.dumps({"beginning": "", "middle": "", "climax": "", "resolution": ""}),
+        json.dumps([]),
+        json.dumps({"style": ""}),
+        f"2024-01-01 00:00:{i % 60:02d}.000000",
+    )
+
+
+def create_baseline_db(path: str, worlds: int):
+    db = sqlite3.connect(path)
+    db.executescript(BASELINE_SCHEMA)
+    db.executemany(f"INSERT INTO storyworlds VALUES ({', '.join('?' * 12)})", [baseline_row(i) for i in range(worlds)])
+    db.commit()
+    db.close()
+
+
+def run_cli(env: dict, cwd: str, *args) -> str:
+    result = subprocess.run([sys.executable, os.path.join(BACKEND_DIR, "main.py"), *args],
+                            cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"main.py {' '.join(args)} failed:\n{result.stderr}")
+    return result.stdout
+
+
+def check(worlds: int) -> dict:
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "baseline.db")
+        create_baseline_db(path, worlds)
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{path}", LOG_FILE="")
+        run_cli(env, tmp, "migrate")
+
+        db = sqlite3.connect(path)
+        applied = [row[0] for row in db.execute("SELECT version FROM schema_migrations ORDER BY version")]
+        indexed = db.execute("SELECT count(*) FROM storyworlds_fts WHERE storyworlds_fts MATCH 'legacy'").fetchone()[0]
+        counted = db.execute("SELECT coalesce(sum(count), 0) FROM storyworld_counts").fetchone()[0]
+        next_id = db.execute("SELECT next_id FROM storyworld_id_allocator WHERE name = 'storyworlds'").fetchone()[0]
+        db.close()
+        exported = [json.loads(line) for line in run_cli(env, tmp, "export", "--genre", GENRES[0]).splitlines()]
+
+    expected_export = len(range(0, worlds, len(GENRES)))
+    if applied != list(range(1, len(applied) + 1)) or not applied:
+        failures.append(f"schema_migrations holds {applied}")
+    if indexed != worlds:
+        failures.append(f"{indexed} of {worlds} worlds in the search index")
+    if counted != worlds:
+        failures.append(f"storyworld_counts sums to {counted}, expected {worlds}")
+    if next_id != worlds + 1:
+        failures.append(f"ID allocator starts at {next_id}, expected {worlds + 1}")
+    if len(exported) != expected_export or any(world["characters"][0]["name"] != f"Hero{world['id'] - 1}" for world in exported):
+        failures.append(f"export returned {len(exported)} of {expected_export} {GENRES[0]} worlds")
+    return {"worlds": worlds, "migrations": applied, "failures": failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--worlds", type=int, default=50)
+    args = parser.parse_args()
+
+    results = check(args.worlds)
+    print(json.dumps(results, indent=2))
+    if results["failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Shared helpers for the benchmark scripts.
+
+Each benchmark boots a real uvicorn process against a throwaway SQLite
+database so numbers reflect the full request path (routing, rate limiter,
+validation, persistence) without touching the developer's storyworld.db.
+"""
+import contextlib
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def running_server(env=None, startup_timeout: float = 30.0, cli: bool = False):
+    """Start `main:app` under uvicorn in a temp directory and yield its port.
+
+    With `cli=True` the server is started through `python main.py serve`
+    (HOST/PORT/WORKERS from the environment) instead of the uvicorn CLI.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        port = free_port()
+        server_env = dict(os.environ)
+        server_env.update({
+            "DATABASE_URL": f"sqlite:///{tmp}/bench.db",
+            "AUTO_MIGRATE": "true",  # a fresh database for every run
+            "RATE_LIMIT": "1000000/minute",
+            "BATCH_RATE_LIMIT": "1000000/minute",
+            "READ_RATE_LIMIT": "1000000/minute",
+            "DELETE_RATE_LIMIT": "1000000/minute",
+        })
+        server_env.update(env or {})
+        if cli:
+            server_env.update({"HOST": "127.0.0.1", "PORT": str(port)})
+            command = [sys.executable, os.path.join(BACKEND_DIR, "main.py"), "serve"]
+        else:
+            command = [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR,
+                       "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+        proc = subprocess.Popen(
+            command,
+            cwd=tmp, env=server_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            deadline = time.monotonic() + startup_timeout
+            while True:
+                try:
+                    client = Client(port)
+                    status, _ = request(client, "GET", "/health")
+                    client.close()
+                    if status == 200:
+                        break
+                except OSError:
+                    pass
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("benchmark server failed to start")
+                time.sleep(0.1)
+            yield port
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+
+class Client:
+    """A keep-alive HTTP connection to the benchmark server (one per thread)."""
+
+    def __init__(self, port: int):
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+
+    def close(self):
+        self.conn.close()
+
+
+def request(client: Client, method: str, path: str, payload=None, headers=None):
+    body = None if payload is None else json.dumps(payload)
+    all_headers = {"Content-Type": "application/json"} if body is not None else {}
+    all_headers.update(headers or {})
+    client.conn.request(method, path, body=body, headers=all_headers)
+    response = client.conn.getresponse()
+    return response.status, response.read()
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed: float, items: int = None) -> dict:
+    """Throughput plus latency percentiles (milliseconds) for a run."""
+    count = len(latencies)
+    return {
+        "requests": count,
+        "items": items if items is not None else count,
+        "elapsed_s": round(elapsed, 4),
+        "items_per_s": round((items if items is not None else count) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def run_concurrent(port: int, calls, concurrency: int) -> dict:
+    """Spread (method, path, payload, expected_status) calls over `concurrency` connections."""
+    latencies, lock = [], threading.Lock()
+
+    def worker(chunk):
+        client = Client(port)
+        local = []
+        try:
+            for method, path, payload, expected in chunk:
+                t0 = time.perf_counter()
+                status, _ = request(client, method, path, payload)
+                local.append(time.perf_counter() - t0)
+                assert status == expected, (method, path, status)
+        finally:
+            client.close()
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker, calls[w::concurrency]) for w in range(concurrency)]:
+            future.result()
+    return summarize(latencies, time.perf_counter() - start)
@@ -0,0 +1,86 @@
+"""Load test comparing inline database calls with the DB thread-pool offload.
+
+Runs the same concurrent mix of POST /generate-world and GET /worlds/{id}
+against a server started with DB_OFFLOAD=false and DB_OFFLOAD=true, at
+several concurrency levels, and reports p50/p95/p99 latency for each.
+
+Keep the inline levels below the SQLAlchemy pool size (15 connections by
+default): with inline calls a request waiting on the pool blocks the event
+loop that would release connections, so the inline server stalls until the
+pool timeout.
+
+Usage (from the backend directory):
+    python benchmarks/load_db_offload.py --requests 400 --concurrency 1 4 12
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import Client, request, running_server, summarize
+
+SEED_WORLDS = 200
+
+
+def worker(port: int, count: int, offset: int, latencies: list, lock: threading.Lock):
+    client = Client(port)
+    local = []
+    try:
+        _run_requests(client, count, offset, local)
+    finally:
+        client.close()
+    with lock:
+        latencies.extend(local)
+
+
+def _run_requests(client: Client, count: int, offset: int, local: list):
+    for i in range(count):
+        n = offset + i
+        t0 = time.perf_counter()
+        if n % 4 == 0:
+            status, _ = request(client, "POST", "/generate-world",
+                                {"theme": f"load test world {n}", "complexity": "complex"})
+            assert status == 201, status
+        else:
+            status, _ = request(client, "GET", f"/worlds/{n % SEED_WORLDS + 1}")
+            assert status == 200, status
+        local.append(time.perf_counter() - t0)
+
+
+def run_level(port: int, total: int, concurrency: int) -> dict:
+    latencies, lock = [], threading.Lock()
+    per_worker = max(1, total // concurrency)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(worker, port, per_worker, w * per_worker, latencies, lock)
+                   for w in range(concurrency)]
+        for future in futures:
+            future.result()
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def run_mode(offload: bool, total: int, levels) -> dict:
+    with running_server({"DB_OFFLOAD": str(offload).lower()}) as port:
+        seed = [{"theme": f"seed world {i}"} for i in range(SEED_WORLDS)]
+        client = Client(port)
+        status, _ = request(client, "POST", "/generate-worlds", seed)
+        client.close()
+        assert status == 201, status
+        return {str(level): run_level(port, total, level) for level in levels}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 12])
+    args = parser.parse_args()
+
+    print(json.dumps({
+        "inline": run_mode(False, args.requests, args.concurrency),
+        "offload": run_mode(True, args.requests, args.concurrency),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Run the API benchmark and the generator microbenchmarks as one report.
+
+Writes a single JSON document (environment metadata, bench_api results,
+bench_generators results) so releases can be compared. With --baseline,
+every metric is compared against an earlier report and the script exits
+with status 1 if any got worse by more than --tolerance:
+throughput (items_per_s) must not drop, latencies, per-call times and
+memory must not rise.
+
+Usage (from the backend directory):
+    python benchmarks/suite.py -o bench-1.1.0.json
+    python benchmarks/suite.py -o bench-1.2.0.json --baseline bench-1.1.0.json --tolerance 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import bench_api
+import bench_generators
+from common import BACKEND_DIR
+
+SKIPPED_METRICS = {"requests", "items", "elapsed_s"}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    metrics = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and key not in SKIPPED_METRICS:
+            metrics[name] = value
+    return metrics
+
+
+def regressions(current: dict, baseline: dict, tolerance: float) -> list:
+    found = []
+    old_metrics = flatten(baseline["results"])
+    for name, new in flatten(current["results"]).items():
+        old = old_metrics.get(name)
+        if not old:
+            continue
+        higher_is_better = name.endswith("items_per_s")
+        change = (new - old) / old
+        if (-change if higher_is_better else change) > tolerance:
+            found.append({"metric": name, "baseline": old, "current": new, "change": round(change, 4)})
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-o", "--output", default="-", help="Report file (default: stdout)")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--worlds", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    report = {
+        "version": bench_generators.main.settings.version,
+        "git_revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "results": {
+            "api": bench_api.run(args.worlds, args.requests, args.concurrency, limit=20),
+            "generators": bench_generators.run(args.repeat),
+        },
+    }
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            report["regressions"] = regressions(report, json.load(baseline), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(output)
+    else:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    if report.get("regressions"):
+        print(f"{len(report['regressions'])} metric(s) regressed beyond {args.tolerance:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
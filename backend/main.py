@@ -1,42 +1,54 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Request
+from fastapi import APIRouter, FastAPI, HTTPException, Depends, status, Request, Response, Body, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Mapping, Optional
+import argparse
+import atexit
+import base64
+import contextlib
 import json
+import orjson
+import prometheus_client
+import prometheus_client.multiprocess
+import queue
 import random
+import asyncio
+import functools
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass
+from operator import itemgetter
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, WatchedFileHandler
+import re
+import shutil
+import sqlite3
+import string
+import sys
+import tempfile
+import urllib.parse
+import zlib
+from limits.storage import Storage
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from sqlalchemy import create_engine, Column, String, Text, DateTime, Integer
+from sqlalchemy import URL, create_engine, event, make_url, func, inspect, insert, or_, select, text, tuple_, update, Column, Index, String, Text, DateTime, Integer, LargeBinary
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
+from starlette.datastructures import Headers, MutableHeaders
 import os
-from dotenv import load_dotenv
-#=======
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware 
-from pydantic import BaseModel
-from typing import List, Dict, Any
-import json
-import random 
-from datetime import datetime 
-
 
-# Load environment variables
-load_dotenv()
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('backend.log'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
+try:
+    import brotli
+except ImportError:  # "br" is only offered when brotli is installed
+    brotli = None
 
 # Settings
 class Settings(BaseSettings):
@@ -49,12 +61,200 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
     rate_limit: str = "10/minute"
+    batch_rate_limit: str = "5/minute"
+    read_rate_limit: str = "20/minute"
+    delete_rate_limit: str = "10/minute"
+    export_rate_limit: str = "2/minute"
+    max_batch_size: int = 1000
     database_url: str = "sqlite:///./storyworld.db"
+    db_offload: bool = True
+    db_max_threads: int = 16
+    generation_cache_size: int = 1024
+    generation_cache_ttl: int = 3600
+    world_cache_size: int = 4096
+    world_cache_ttl: int = 300
+    max_page_size: int = 100
+    export_chunk_size: int = 1000
+    storage_mode: str = "document"  # "document" (single orjson blob), "compact" (template indices) or "columns" (legacy per-field JSON)
+    id_block_size: int = 100
+    write_behind: bool = False
+    write_behind_queue_size: int = 10000
+    write_behind_batch_size: int = 500
+    write_behind_enqueue_timeout: float = 1.0
+    workers: int = 1
+    # Defaults to "memory://" for one worker and a shared SQLite file for several
+    rate_limit_storage_uri: Optional[str] = None
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_profile: str = "tuned"  # see SQLITE_PROFILES
+    sqlite_mmap_size: Optional[int] = None  # overrides the profile
+    sqlite_cache_size: Optional[int] = None  # overrides the profile (negative = KiB)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle: int = -1
+    db_pool_timeout: float = 30.0
+    log_level: str = "INFO"
+    log_format: str = "json"  # "json" (one object per line) or "text"
+    log_file: Optional[str] = "backend.log"  # empty disables the file handler
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_backup_count: int = 5
+    log_sample_rate: float = 1.0  # fraction of per-request info lines kept
+    access_log: bool = True
+    vectorized_min_batch: int = 32  # unseeded worlds per batch before the numpy engine is used; 0 disables
+    template_dir: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+    template_reload_interval: float = 2.0  # seconds between checks for changed packs; 0 disables
+    compression_min_size: int = 1024  # bytes; smaller responses are sent uncompressed
+    compression_encodings: List[str] = ["br", "gzip"]  # preferred first; empty disables compression
+    gzip_level: int = 3  # 1-9; past 3 pages get little smaller but much slower to compress
+    brotli_quality: int = 4  # 0-11; higher is smaller but much slower
+    auto_migrate: bool = False  # apply migrations in every app process at startup (else `python main.py migrate`)
 
 settings = Settings()
 
+# Logging. Callers only put records on an in-memory queue; a listener
+# thread formats them and does the file/console I/O, so a slow disk never
+# stalls the event loop. Nothing is opened until configure_logging() runs
+# (app startup or a CLI command), so importing this module stays cheap.
+# uvicorn attaches an ANSI-coloured duplicate of each message as `color_message`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName", "color_message"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra=` fields are included as keys."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+class SamplingFilter(logging.Filter):
+    """Keep roughly `rate` of INFO-and-below records; warnings and errors always pass."""
+    
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.INFO or self.rate >= 1 or random.random() < self.rate
+
+class DeferredQueueHandler(QueueHandler):
+    """Enqueue records as-is, leaving message formatting to the listener thread."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+# Neither format uses caller, thread or process fields; skipping them makes
+# each record cheaper to build (see "Optimization" in the logging HOWTO).
+logging._srcfile = None
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+log_listener: Optional[QueueListener] = None
+
+def configure_logging() -> QueueListener:
+    """Install the queue handler and start its listener; later calls return the running listener."""
+    global log_listener
+    if log_listener is not None:
+        return log_listener
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    if settings.log_file and settings.workers > 1:
+        # Rollover is not safe across processes: one worker renaming the file
+        # strands the others on the old inode. Workers append to one file and
+        # leave rotation to logrotate; WatchedFileHandler reopens after a move.
+        handlers.append(WatchedFileHandler(settings.log_file))
+    elif settings.log_file:
+        handlers.append(RotatingFileHandler(settings.log_file, maxBytes=settings.log_max_bytes, backupCount=settings.log_backup_count))
+    formatter = JsonFormatter() if settings.log_format == "json" else logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [DeferredQueueHandler(log_queue)]
+    root.setLevel(settings.log_level)
+    # Route uvicorn's own (synchronous) handlers through the queue as well
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers.clear()
+        logging.getLogger(name).propagate = True
+    
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    log_listener = listener
+    return listener
+
+logger = logging.getLogger(__name__)
+# High-volume per-request lines go through a sampled child logger
+request_logger = logging.getLogger(f"{__name__}.requests")
+request_logger.addFilter(SamplingFilter(settings.log_sample_rate))
+LOG_THEME_CHARS = 80
+
 # Database setup
-engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
+# SQLite pragmas applied to every new connection. "tuned" runs WAL with
+# synchronous=NORMAL: commits no longer fsync, and a power loss can drop the
+# last few transactions but never corrupts the database. "durable" keeps an
+# fsync per commit; "default" leaves SQLite's rollback journal as is.
+SQLITE_PROFILES = {
+    "default": {},
+    "durable": {"journal_mode": "WAL", "synchronous": "FULL"},
+    "tuned": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    if settings.sqlite_profile not in SQLITE_PROFILES:
+        raise ValueError(f"SQLITE_PROFILE must be one of: {', '.join(SQLITE_PROFILES)}")
+    pragmas = dict(SQLITE_PROFILES[settings.sqlite_profile])
+    if settings.sqlite_mmap_size is not None:
+        pragmas["mmap_size"] = settings.sqlite_mmap_size
+    if settings.sqlite_cache_size is not None:
+        pragmas["cache_size"] = settings.sqlite_cache_size
+    # Lets writers in other worker processes wait for the lock instead of failing
+    pragmas["busy_timeout"] = settings.sqlite_busy_timeout_ms
+    return pragmas
+
+def engine_options(url: URL) -> Dict[str, Any]:
+    """create_engine() keyword arguments for the configured pool and dialect."""
+    pool = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+    if url.get_backend_name() != "sqlite":
+        return pool
+    options = {"connect_args": {"check_same_thread": False}}
+    # In-memory databases use a single-connection pool that takes no sizing
+    if url.database not in (None, "", ":memory:"):
+        options.update(pool)
+    return options
+
+database_url = make_url(settings.database_url)
+engine = create_engine(database_url, **engine_options(database_url))
+
+if engine.dialect.name == "sqlite":
+    SQLITE_PRAGMAS = sqlite_pragmas()
+    
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -72,10 +272,211 @@ class StoryWorldDB(Base):
     story_arc = Column(Text)  # JSON string
     dialogues = Column(Text)  # JSON string
     art_prompts = Column(Text)  # JSON string
+    document = Column(LargeBinary)  # orjson-encoded world payload (document mode), or its compact encoding
+    template_version = Column(Integer)  # compact mode: the storyworld_templates version `document` indexes into
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    __table_args__ = (
+        # Serves ORDER BY created_at DESC, id DESC and keyset (cursor) pagination
+        Index("ix_storyworlds_created_at_id", "created_at", "id"),
+        # Filtered listings keep the same newest-first order inside each filter
+        Index("ix_storyworlds_genre_created_at_id", "genre", "created_at", "id"),
+        Index("ix_storyworlds_complexity_created_at_id", "complexity", "created_at", "id"),
+        Index("ix_storyworlds_genre_complexity_created_at_id", "genre", "complexity", "created_at", "id"),
+        Index("ix_storyworlds_theme", "theme"),
+    )
+
+class StoryWorldCountDB(Base):
+    """Per (genre, complexity) world counts, maintained on insert and delete."""
+    __tablename__ = "storyworld_counts"
+    
+    genre = Column(String, primary_key=True)
+    complexity = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class SchemaMigrationDB(Base):
+    __tablename__ = "schema_migrations"
+    
+    version = Column(Integer, primary_key=True)
+    name = Column(String)
+    applied_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+class StoryWorldTemplateDB(Base):
+    """Append-only versions of the interned template table behind compact storage."""
+    __tablename__ = "storyworld_templates"
+    
+    version = Column(Integer, primary_key=True)
+    digest = Column(String, unique=True, nullable=False)
+    body = Column(LargeBinary, nullable=False)  # orjson: strings, dialogue and art prompt template sources
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+class StoryWorldIdAllocatorDB(Base):
+    """High-water mark for storyworld IDs; processes reserve blocks from it (hi/lo)."""
+    __tablename__ = "storyworld_id_allocator"
+    
+    name = Column(String, primary_key=True)
+    next_id = Column(Integer, nullable=False)
+
+# Schema migrations: create_all() only creates missing tables, so changes to
+# existing tables are applied here in order and recorded in schema_migrations.
+def _add_document_column(conn):
+    columns = {column["name"] for column in inspect(conn).get_columns("storyworlds")}
+    if "document" not in columns:
+        column_type = LargeBinary().compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE storyworlds ADD COLUMN document {column_type}"))
+
+def _add_template_version_column(conn):
+    columns = {column["name"] for column in inspect(conn).get_columns("storyworlds")}
+    if "template_version" not in columns:
+        conn.execute(text("ALTER TABLE storyworlds ADD COLUMN template_version INTEGER"))
+
+def _create_indexes(*names):
+    """Build a migration that creates the named StoryWorldDB indexes if missing."""
+    def migrate(conn):
+        for index in StoryWorldDB.__table__.indexes:
+            if index.name in names:
+                index.create(conn, checkfirst=True)
+    return migrate
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Full-text search index (SQLite FTS5). rowid mirrors storyworlds.id; character
+# and location names are stored as space-separated text.
+SEARCH_INDEX_ENABLED = engine.dialect.name == "sqlite"
+SEARCH_COLUMNS = ("title", "summary", "theme", "characters", "locations")
+SEARCH_WEIGHTS = "10.0, 2.0, 4.0, 5.0, 3.0"  # bm25 column weights, same order
+
+SEARCH_INSERT_SQL = text(
+    f"INSERT INTO storyworlds_fts(rowid, {', '.join(SEARCH_COLUMNS)}) "
+    f"VALUES (:rowid, {', '.join(':' + column for column in SEARCH_COLUMNS)})"
+)
+
+def search_entry(world_id: int, title: str, summary: str, theme: str, character_names, location_names) -> Dict[str, Any]:
+    return {
+        "rowid": world_id,
+        "title": title,
+        "summary": summary,
+        "theme": theme,
+        "characters": " ".join(character_names),
+        "locations": " ".join(location_names)
+    }
+
+def _create_search_index(conn):
+    if not SEARCH_INDEX_ENABLED:
+        return
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS storyworlds_fts USING fts5({', '.join(SEARCH_COLUMNS)}, tokenize='unicode61 remove_diacritics 2')"
+    ))
+    # Backfill worlds stored before the index existed. List the columns this
+    # migration reads: select(table) would also pick up columns that only
+    # later migrations add.
+    table = StoryWorldDB.__table__
+    columns = ("id", "title", "summary", "theme", "characters", "locations", "document")
+    rows = conn.execute(select(*(table.c[name] for name in columns)).execution_options(yield_per=1000))
+    for partition in rows.partitions():
+        entries = []
+        for row in partition:
+            payload = orjson.loads(row.document) if row.document is not None else {
+                "characters": json.loads(row.characters), "locations": json.loads(row.locations)
+            }
+            entries.append(search_entry(
+                row.id, row.title, row.summary, row.theme,
+                [char["name"] for char in payload["characters"]],
+                [loc["name"] for loc in payload["locations"]]
+            ))
+        conn.execute(SEARCH_INSERT_SQL, entries)
+
+def _backfill_world_counts(conn):
+    counts = StoryWorldCountDB.__table__
+    table = StoryWorldDB.__table__
+    conn.execute(counts.delete())
+    conn.execute(counts.insert().from_select(
+        ["genre", "complexity", "count"],
+        select(table.c.genre, table.c.complexity, func.count()).group_by(table.c.genre, table.c.complexity)
+    ))
+
+def _seed_id_allocator(conn):
+    allocator = StoryWorldIdAllocatorDB.__table__
+    max_id = conn.scalar(select(func.max(StoryWorldDB.__table__.c.id))) or 0
+    conn.execute(allocator.delete())
+    conn.execute(allocator.insert().values(name="storyworlds", next_id=max_id + 1))
+
+MIGRATIONS = [
+    (1, "add storyworlds.document", _add_document_column),
+    (2, "add ix_storyworlds_created_at_id", _create_indexes("ix_storyworlds_created_at_id")),
+    (3, "add storyworlds_fts search index", _create_search_index),
+    (4, "add filter indexes", _create_indexes(
+        "ix_storyworlds_genre_created_at_id",
+        "ix_storyworlds_complexity_created_at_id",
+        "ix_storyworlds_genre_complexity_created_at_id",
+        "ix_storyworlds_theme",
+    )),
+    (5, "backfill storyworld_counts", _backfill_world_counts),
+    (6, "seed storyworld_id_allocator", _seed_id_allocator),
+    (7, "add storyworlds.template_version", _add_template_version_column),
+]
+
+def run_migrations(bind):
+    """Create missing tables and apply pending migrations."""
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        applied = set(conn.scalars(select(SchemaMigrationDB.version)))
+        for version, name, migrate in MIGRATIONS:
+            if version in applied:
+                continue
+            migrate(conn)
+            conn.execute(insert(SchemaMigrationDB).values(version=version, name=name))
+            logger.info("Applied migration %d: %s", version, name)
+
+def pending_migrations(bind) -> List[str]:
+    """Names of the migrations not yet applied (every one on an empty database)."""
+    if not inspect(bind).has_table(SchemaMigrationDB.__tablename__):
+        return [name for _, name, _ in MIGRATIONS]
+    with bind.connect() as conn:
+        applied = set(conn.scalars(select(SchemaMigrationDB.version)))
+    return [name for version, name, _ in MIGRATIONS if version not in applied]
+
+class IdAllocator:
+    """Hands out storyworld IDs reserved in storyworld_id_allocator.
+    
+    Every writer reserves from the same row, so IDs are unique across
+    processes. `reserve` takes exactly the IDs an insert needs inside the
+    insert's own transaction, so they commit or roll back with its rows and
+    leave no gaps. `allocate` is for write-behind, which gives a world its ID
+    before it is written: it reserves a block per short transaction, and IDs
+    left in a block when the process exits are simply skipped.
+    """
+    
+    def __init__(self, bind, block_size: int):
+        self.bind = bind
+        self.block_size = block_size
+        self._next = self._limit = 0
+        self._lock = threading.Lock()
+    
+    def allocate(self, count: int = 1) -> List[int]:
+        with self._lock:
+            if self._limit - self._next < count:
+                size = max(count, self.block_size)
+                with self.bind.begin() as conn:
+                    self._next = self._claim(conn, size)
+                self._limit = self._next + size
+            start = self._next
+            self._next += count
+        return list(range(start, start + count))
+    
+    def reserve(self, conn, count: int) -> List[int]:
+        start = self._claim(conn, count)
+        return list(range(start, start + count))
+    
+    @staticmethod
+    def _claim(conn, count: int) -> int:
+        allocator = StoryWorldIdAllocatorDB.__table__
+        return conn.scalar(
+            update(allocator)
+            .where(allocator.c.name == "storyworlds")
+            .values(next_id=allocator.c.next_id + count)
+            .returning(allocator.c.next_id - count)
+        )
+
+id_allocator = IdAllocator(engine, settings.id_block_size)
 
 # Dependency to get database session
 def get_db():
@@ -85,47 +486,347 @@ def get_db():
     finally:
         db.close()
 
-# FastAPI app
-app = FastAPI(
-    title=settings.app_name,
-    version=settings.version,
-    debug=settings.debug
-)
+# Bounded thread pool for blocking database work, so commits and queries
+# never stall the event loop while other requests are in flight.
+db_executor = ThreadPoolExecutor(max_workers=settings.db_max_threads, thread_name_prefix="storyworld-db")
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking database call on the DB thread pool (or inline when DB_OFFLOAD is off)."""
+    if not settings.db_offload:
+        return func(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(func, *args, **kwargs))
+
+# Metrics, exposed in Prometheus text format at /metrics. Label sets are
+# bounded (route templates, not raw paths) and children are bound up front.
+REQUEST_COUNT = prometheus_client.Counter(
+    "storyworld_http_requests_total", "HTTP requests handled", ["method", "route", "status"])
+REQUEST_LATENCY = prometheus_client.Histogram(
+    "storyworld_http_request_duration_seconds", "HTTP request latency", ["method", "route"])
+RATE_LIMIT_REJECTIONS = prometheus_client.Counter(
+    "storyworld_rate_limit_rejections_total", "Requests rejected by the rate limiter", ["route"])
+DB_QUERY_LATENCY = prometheus_client.Histogram(
+    "storyworld_db_query_duration_seconds", "Database statement latency", ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+DB_COMMIT_LATENCY = prometheus_client.Histogram(
+    "storyworld_db_commit_duration_seconds", "Database commit latency",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+WRITE_BEHIND_PENDING = prometheus_client.Gauge(
+    "storyworld_write_behind_pending", "Worlds returned to clients but not yet written", multiprocess_mode="livesum")
+WORLD_CACHE_REQUESTS = prometheus_client.Counter(
+    "storyworld_world_cache_requests_total", "GET /worlds/{world_id} lookups in the response cache", ["result"])
+WORLD_CACHE_HITS = WORLD_CACHE_REQUESTS.labels("hit")
+WORLD_CACHE_MISSES = WORLD_CACHE_REQUESTS.labels("miss")
+GENERATION_STAGES = ("name", "characters", "locations", "arc", "dialogues", "art_prompts", "serialization", "persistence")
+STAGE_LATENCY = prometheus_client.Histogram(
+    "storyworld_generation_stage_duration_seconds", "Time spent in each world generation stage", ["stage"],
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.25, 1.0))
+STAGE_TIMERS = {stage: STAGE_LATENCY.labels(stage) for stage in GENERATION_STAGES}
+
+@event.listens_for(engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    # One value, not a stack: after_cursor_execute never runs for a statement
+    # that raises, and the next statement simply overwrites its start time
+    conn.info["query_start"] = time.perf_counter()
+
+@event.listens_for(engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop("query_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    DB_QUERY_LATENCY.labels(statement.lstrip().split(None, 1)[0].upper()).observe(elapsed)
+
+@event.listens_for(SessionLocal, "before_commit")
+def _start_commit_timer(session):
+    session.info["commit_start"] = time.perf_counter()
+
+@event.listens_for(SessionLocal, "after_commit")
+def _stop_commit_timer(session):
+    start = session.info.pop("commit_start", None)
+    if start is not None:
+        DB_COMMIT_LATENCY.observe(time.perf_counter() - start)
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts and latency per route template."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        status_code = 500
+        
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.labels(scope["method"], path).observe(time.perf_counter() - start)
+            REQUEST_COUNT.labels(scope["method"], path, str(status_code)).inc()
+
+# Response compression
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+@functools.lru_cache(maxsize=256)
+def negotiate_encoding(accept_encoding: str, available: tuple) -> Optional[str]:
+    """The `available` encoding the client rates highest (ties go to the earlier one), or None."""
+    ratings = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ratings[coding.strip()] = quality
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = ratings.get(coding, ratings.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+class GzipStream:
+    __slots__ = ("_compressor",)
+    
+    def __init__(self):
+        self._compressor = zlib.compressobj(settings.gzip_level, zlib.DEFLATED, 31)
+    
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+    
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+class BrotliStream:
+    __slots__ = ("_compressor",)
+    
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=settings.brotli_quality)
+    
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+    
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+COMPRESSORS = {"gzip": GzipStream, "br": BrotliStream}
+
+def weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag and etag.startswith('"'):
+        headers["ETag"] = "W/" + etag
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with the best encoding the client accepts.
+    
+    Complete bodies under `minimum_size` bytes, bodies that already have a
+    Content-Encoding and non-text types pass through untouched. Streamed
+    bodies are compressed chunk by chunk with a flush after each, so NDJSON
+    events still reach the client as they are produced. Compressing changes
+    the bytes but not the content, so a strong ETag becomes weak; bodies with
+    an ETag are compressed once and reused from `compressed_cache`.
+    """
+    
+    def __init__(self, app, minimum_size: int, encodings: List[str]):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = tuple(e for e in encodings if e in COMPRESSORS and (e != "br" or brotli is not None))
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message = None
+        stream = None
+        passthrough = False
+        
+        async def send_compressed(message):
+            nonlocal start_message, stream, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = MutableHeaders(raw=message["headers"])
+                if message["status"] == 304:
+                    weaken_etag(headers)
+                if message["status"] < 200 or message["status"] in (204, 304) \
+                        or "content-encoding" in headers \
+                        or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES):
+                    passthrough = True
+                    await send(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                etag = headers.get("etag")
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                weaken_etag(headers)
+                if not more_body:
+                    key = (encoding, etag) if etag else None
+                    compressed = compressed_cache.get(key) if key else None
+                    if compressed is None:
+                        compressed = COMPRESSORS[encoding]().finish(body)
+                        if key:
+                            compressed_cache.set(key, compressed)
+                    headers["Content-Length"] = str(len(compressed))
+                    passthrough = True
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                del headers["Content-Length"]
+                stream = COMPRESSORS[encoding]()
+                await send(start_message)
+            data = stream.chunk(body) if more_body else stream.finish(body)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+        
+        await self.app(scope, receive, send_compressed)
+
+class SQLiteLimitStorage(Storage):
+    """Fixed-window rate-limit counters in a SQLite file shared by all worker processes.
+    
+    Registered with `limits` under the ``sqlite://`` scheme, using the same
+    path convention as DATABASE_URL (``sqlite:///./ratelimits.db``).
+    """
+    
+    STORAGE_SCHEME = ["sqlite"]
+    PURGE_EVERY = 1000
+    
+    def __init__(self, uri: str, **options):
+        super().__init__(uri, **options)
+        self._path = urllib.parse.urlparse(uri).path[1:] or ":memory:"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._calls = 0
+    
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use (callers hold the lock), not when the app is built
+        if self._conn is None:
+            conn = sqlite3.connect(self._path, timeout=settings.sqlite_busy_timeout_ms / 1000, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits "
+                "(key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID"
+            )
+            self._conn = conn
+        return self._conn
+    
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+    
+    def incr(self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            # One atomic upsert; an expired window restarts at `amount`
+            count = self._connection().execute(
+                "INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET "
+                "count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END, "
+                "expires_at = CASE WHEN expires_at <= ? OR ? THEN excluded.expires_at ELSE expires_at END "
+                "RETURNING count",
+                (key, amount, now + expiry, now, now, elastic_expiry)
+            ).fetchone()[0]
+            self._calls += 1
+            if self._calls % self.PURGE_EVERY == 0:
+                self._connection().execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+        return count
+    
+    def get(self, key: str) -> int:
+        with self._lock:
+            row = self._connection().execute("SELECT count FROM rate_limits WHERE key = ? AND expires_at > ?", (key, time.time())).fetchone()
+        return row[0] if row else 0
+    
+    def get_expiry(self, key: str) -> float:
+        with self._lock:
+            row = self._connection().execute("SELECT expires_at FROM rate_limits WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else time.time()
+    
+    def check(self) -> bool:
+        try:
+            with self._lock:
+                self._connection().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def reset(self) -> Optional[int]:
+        with self._lock:
+            return self._connection().execute("DELETE FROM rate_limits").rowcount
+    
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+def rate_limit_storage_uri() -> str:
+    if settings.rate_limit_storage_uri:
+        return settings.rate_limit_storage_uri
+    # In-process counters would give every worker its own full quota
+    return "memory://" if settings.workers <= 1 else "sqlite:///./ratelimits.db"
+
+# Routes are collected on a router; create_app() mounts them on an app.
+# Endpoints that do not build their own body still serialize with orjson.
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Rate limiter
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+limiter = Limiter(key_func=get_remote_address, storage_uri=rate_limit_storage_uri())
+
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    route = request.scope.get("route")
+    RATE_LIMIT_REJECTIONS.labels(getattr(route, "path", "unmatched")).inc()
+    return _rate_limit_exceeded_handler(request, exc)
 
 # Pydantic models with validation
 class StoryRequest(BaseModel):
     theme: str = Field(..., min_length=3, max_length=500, description="Theme for the story world")
     genre: str = Field(default="fantasy", description="Genre of the story world")
     complexity: str = Field(default="medium", description="Complexity level")
+    seed: Optional[int] = Field(default=None, ge=0, description="Seed for reproducible generation")
     
     @field_validator('genre')
     @classmethod
     def validate_genre(cls, v):
-        valid_genres = ["fantasy", "sci-fi", "steampunk"]
-        if v not in valid_genres:
-            raise ValueError(f"Genre must be one of: {', '.join(valid_genres)}")
+        if v not in template_registry.packs:
+            raise ValueError(f"Genre must be one of: {', '.join(template_registry.genres)}")
         return v
     
     @field_validator('complexity')
     @classmethod
     def validate_complexity(cls, v):
-        valid_complexities = ["simple", "medium", "complex"]
-        if v not in valid_complexities:
-            raise ValueError(f"Complexity must be one of: {', '.join(valid_complexities)}")
+        if v not in COMPLEXITY_MULTIPLIERS:
+            raise ValueError(f"Complexity must be one of: {', '.join(COMPLEXITY_MULTIPLIERS)}")
         return v
     
     @field_validator('theme')
@@ -160,51 +861,138 @@ class StoryWorld(BaseModel):
     art_prompts: List[str]
     created_at: Optional[datetime] = None
 
-# Expanded world building components
-WORLD_TEMPLATES = {
-    "sci-fi": {
-        "settings": [
-            "desert planet", "space station", "cyberpunk city", "alien jungle", 
-            "ocean world", "asteroid mining colony", "dyson sphere", "nebula outpost",
-            "terraformed moon", "generation ship", "orbital habitat", "ice planet"
-        ],
-        "tech_levels": ["advanced", "post-apocalyptic", "emerging", "lost technology", "biotech", "quantum"],
-        "conflicts": [
-            "resource war", "AI uprising", "first contact", "corporate domination",
-            "interstellar plague", "dimensional breach", "ancient weapon discovery",
-            "rebellion against empire", "alien invasion", "time paradox"
-        ]
-    },
-    "fantasy": {
-        "settings": [
-            "floating islands", "underground cities", "enchanted forest", "crystal mountains",
-            "magical academy", "dragon's lair", "cursed kingdom", "elemental planes",
-            "ancient library", "fey realm", "dwarven stronghold", "elven sanctuary"
-        ],
-        "magic_systems": ["elemental", "runic", "blood magic", "nature magic", "arcane", "divine", "necromancy", "illusion"],
-        "conflicts": [
-            "ancient prophecy", "kingdom war", "magic corruption", "monster invasion",
-            "dark lord rising", "artifact hunt", "civil war", "divine intervention",
-            "curse spreading", "portal to other worlds opening"
-        ]
-    },
-    "steampunk": {
-        "settings": [
-            "victorian London", "clockwork city", "aerial kingdoms", "subterranean factories",
-            "steam-powered fortress", "airship fleet", "underwater city", "mechanical forest",
-            "gearwork metropolis", "aether research facility", "ironclad naval base"
-        ],
-        "tech_levels": ["steam-powered", "clockwork", "tesla technology", "aether-powered", "hydraulic", "pneumatic"],
-        "conflicts": [
-            "class struggle", "industrial revolution", "secret societies", "invention race",
-            "royal conspiracy", "labor uprising", "foreign espionage", "technological disaster",
-            "ancient automaton awakening", "energy crisis"
-        ]
-    }
-}
+# Internal world representation. Generators build these plain slotted
+# dataclasses; orjson serializes them natively (in field order), so a world is
+# never validated or dumped through pydantic on the way to the database or the
+# response. The pydantic models above describe the same JSON for the API docs.
+@dataclass
+class CharacterData:
+    __slots__ = ("name", "role", "personality", "motivation", "backstory")
+    name: str
+    role: str
+    personality: str
+    motivation: str
+    backstory: str
+
+@dataclass
+class LocationData:
+    __slots__ = ("name", "description", "type")
+    name: str
+    description: str
+    type: str
+
+@dataclass
+class WorldData:
+    __slots__ = (
+        "id", "title", "summary", "theme", "genre", "complexity", "characters",
+        "locations", "story_arc", "dialogues", "art_prompts", "created_at"
+    )
+    id: Optional[int]
+    title: str
+    summary: str
+    theme: str
+    genre: str
+    complexity: str
+    characters: List[CharacterData]
+    locations: List[LocationData]
+    story_arc: Dict[str, Any]
+    dialogues: List[Dict[str, str]]
+    art_prompts: List[str]
+    created_at: Optional[datetime]
+
+class BatchGenerateResponse(BaseModel):
+    ids: List[int]
+    count: int
+
+class WorldCount(BaseModel):
+    count: int
+
+class GenreList(BaseModel):
+    genres: List[str]
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds."""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if self.ttl and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def discard_where(self, predicate):
+        """Remove every entry whose value matches `predicate`."""
+        with self._lock:
+            for key in [k for k, (_, value) in self._data.items() if predicate(value)]:
+                del self._data[key]
+
+# Seeded requests are deterministic, so their worlds are cached by content key.
+# The cache is per process: with several workers a repeat that lands on another
+# worker generates and stores a duplicate row.
+generation_cache = TTLCache(settings.generation_cache_size, settings.generation_cache_ttl)
+
+# Stored worlds never change (only deletion), so GET /worlds/{id} responses are
+# cached as (etag, body) by ID. Deletes in another worker process are only
+# seen once the entry's TTL runs out.
+world_cache = TTLCache(settings.world_cache_size, settings.world_cache_ttl)
+
+# Compressed bodies keyed by (encoding, ETag). ETags are content hashes, so
+# entries never go stale and need no TTL.
+compressed_cache = TTLCache(settings.world_cache_size, 0)
+
+def world_etag(body: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest()
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    return any(tag.strip() in ("*", etag, "W/" + etag) for tag in if_none_match.split(","))
+
+def generation_cache_key(story_request: StoryRequest) -> Optional[tuple]:
+    if story_request.seed is None:
+        return None
+    return (story_request.theme, story_request.genre, story_request.complexity, story_request.seed)
+
+# Template registry: every table the generators read is built once as
+# immutable tuples/mappings, so generating a world only indexes into them.
+# Shared tables live here; per-genre tables come from the template packs below.
+def _freeze(value):
+    """Recursively convert dicts to read-only mappings and lists to tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+DEFAULT_SETTINGS = ("mysterious land",)
+DEFAULT_CONFLICTS = ("ancient forces clash",)
 
 # Expanded character archetypes
-CHARACTER_ARCHETYPES = [
+CHARACTER_ARCHETYPES = _freeze([
     {"role": "Hero", "traits": ["brave", "determined", "compassionate", "selfless", "resilient"]},
     {"role": "Mentor", "traits": ["wise", "mysterious", "protective", "patient", "experienced"]},
     {"role": "Rogue", "traits": ["clever", "self-serving", "charismatic", "agile", "opportunistic"]},
@@ -213,457 +1001,1559 @@ CHARACTER_ARCHETYPES = [
     {"role": "Healer", "traits": ["caring", "gentle", "empathetic", "spiritual", "nurturing"]},
     {"role": "Trickster", "traits": ["playful", "unpredictable", "mischievous", "witty", "chaotic"]},
     {"role": "Ruler", "traits": ["commanding", "strategic", "diplomatic", "proud", "responsible"]}
-]
+])
+ARCHETYPE_ROLES = tuple(arch["role"] for arch in CHARACTER_ARCHETYPES)
 
-# Expanded name pools
-FIRST_NAMES = {
-    "fantasy": ["Kael", "Lyra", "Orion", "Seraphina", "Darian", "Elara", "Theron", "Zephyra", "Aldric", "Isolde", "Caelum", "Nyx", "Aurelius", "Celestia", "Magnus", "Valerius", "Elysia", "Thaddeus", "Octavia", "Lucian"],
-    "sci-fi": ["Zara", "Nova", "Axel", "Vega", "Orion", "Lyra", "Cassian", "Nova", "Rylan", "Kira", "Jax", "Aria", "Zephyr", "Nova", "Atlas", "Luna", "Phoenix", "Echo", "Zenith", "Cosmo"],
-    "steampunk": ["Victoria", "Percival", "Arabella", "Cornelius", "Beatrix", "Reginald", "Evangeline", "Theodore", "Adelaide", "Montgomery", "Clementine", "Archibald", "Genevieve", "Barnaby", "Seraphina", "Fitzwilliam", "Octavia", "Pendleton", "Imogen", "Sterling"]
-}
+COMPLEXITY_MULTIPLIERS = _freeze({
+    "simple": {"characters": 3, "locations": 3, "dialogues": 1, "phases": 3},
+    "medium": {"characters": 4, "locations": 4, "dialogues": 2, "phases": 4},
+    "complex": {"characters": 6, "locations": 6, "dialogues": 3, "phases": 5},
+    "epic": {"characters": 24, "locations": 8, "dialogues": 12, "phases": 5}
+})
 
-LAST_NAMES = {
-    "fantasy": ["Stormrider", "Ironwood", "Nightshade", "Brightstar", "Darkwater", "Silverhand", "Frostbane", "Sunweaver", "Moonshadow", "Thornwood", "Starfall", "Dawnbringer", "Ashford", "Winterborne", "Goldleaf", "Ravencrest", "Stormwind", "Fireheart", "Mistwalker", "Stonehaven"],
-    "sci-fi": ["Chen", "Vance", "Mercer", "Steele", "Frost", "Nova", "Quinn", "Reeves", "Sterling", "Cross", "Mercer", "Hawke", "Stark", "Vance", "Reeves", "Frost", "Chen", "Quinn", "Cross", "Hawke"],
-    "steampunk": ["Cogsworth", "Ironhaven", "Steamgard", "Brassport", "Gearwick", "Windsor", "Sterling", "Copperfield", "Ironside", "Brassington", "Steamworth", "Gearheart", "Copperfield", "Ironwood", "Brassington", "Steamworth", "Gearheart", "Copperfield", "Ironwood", "Brassington"]
-}
+DEFAULT_WORLD_NAMES = ("Mystara",)
 
-def get_complexity_multiplier(complexity: str) -> Dict[str, int]:
-    """Returns multipliers based on complexity level."""
-    multipliers = {
-        "simple": {"characters": 3, "locations": 3, "dialogues": 1, "phases": 3},
-        "medium": {"characters": 4, "locations": 4, "dialogues": 2, "phases": 4},
-        "complex": {"characters": 6, "locations": 6, "dialogues": 3, "phases": 5}
-    }
-    return multipliers.get(complexity, multipliers["medium"])
+PERSONALITIES = _freeze({
+    "Hero": "Driven by a strong moral compass and desire to protect others",
+    "Mentor": "Possesses ancient knowledge but harbors hidden secrets",
+    "Rogue": "Charming and resourceful, but trusts few people",
+    "Scholar": "Obsessed with uncovering truths, sometimes at great cost",
+    "Warrior": "Disciplined and loyal, but struggles with inner demons",
+    "Healer": "Dedicated to mending wounds and bringing peace to troubled souls",
+    "Trickster": "Uses wit and deception to achieve goals, often with unexpected results",
+    "Ruler": "Bears the weight of leadership while navigating political intrigue"
+})
+DEFAULT_PERSONALITY = "Complex and multifaceted"
 
-def generate_world_name(genre: str) -> str:
-    names = {
-        "sci-fi": ["Xylos", "Nova Prime", "Cygnus Beta", "Aethelgard", "Veridian", "Zephyrion", "Aurora Prime", "Nebula Haven", "Quantum Reach", "Stellaris", "Cosmos Edge", "Infinity Point", "Nexus Station", "Vortex City", "Pulsar Outpost"],
-        "fantasy": ["Eldoria", "Aetheria", "Mythos", "Valerium", "Draconia", "Arcanum", "Celestia", "Mystara", "Etherea", "Sylvanor", "Dragonspire", "Crystalgard", "Shadowmere", "Luminara", "Frosthold"],
-        "steampunk": ["Cogsworth", "Ironhaven", "Steamgard", "Brassport", "Gearwick", "Aethermoor", "Steamhaven", "Ironclad", "Brasshaven", "Gearborough", "Steamshire", "Ironport", "Aetherburg", "Cogsworth", "Steamton"]
-    }
-    return random.choice(names.get(genre, ["Mystara"]))
-
-def generate_character(role: str, genre: str) -> Character:
-    first_name = random.choice(FIRST_NAMES.get(genre, FIRST_NAMES["fantasy"]))
-    last_name = random.choice(LAST_NAMES.get(genre, LAST_NAMES["fantasy"]))
-    name = f"{first_name} {last_name}"
-    
-    personalities = {
-        "Hero": "Driven by a strong moral compass and desire to protect others",
-        "Mentor": "Possesses ancient knowledge but harbors hidden secrets",
-        "Rogue": "Charming and resourceful, but trusts few people",
-        "Scholar": "Obsessed with uncovering truths, sometimes at great cost",
-        "Warrior": "Disciplined and loyal, but struggles with inner demons",
-        "Healer": "Dedicated to mending wounds and bringing peace to troubled souls",
-        "Trickster": "Uses wit and deception to achieve goals, often with unexpected results",
-        "Ruler": "Bears the weight of leadership while navigating political intrigue"
-    }
-    
-    motivations = [
-        "Seeking redemption for past failures",
-        "Protecting a loved one or homeland",
-        "Uncovering a powerful ancient secret",
-        "Gaining power or knowledge",
-        "Fulfilling an ancient prophecy",
-        "Avenging a fallen comrade",
-        "Finding a place to belong",
-        "Proving worth to doubters",
-        "Breaking free from destiny",
-        "Saving the world from destruction"
+MOTIVATIONS = _freeze([
+    "Seeking redemption for past failures",
+    "Protecting a loved one or homeland",
+    "Uncovering a powerful ancient secret",
+    "Gaining power or knowledge",
+    "Fulfilling an ancient prophecy",
+    "Avenging a fallen comrade",
+    "Finding a place to belong",
+    "Proving worth to doubters",
+    "Breaking free from destiny",
+    "Saving the world from destruction"
+])
+
+BACKSTORIES = _freeze([
+    "Exiled from their homeland for a crime they didn't commit",
+    "Last surviving member of a destroyed order or family",
+    "Chosen by fate to wield a powerful artifact",
+    "Former enemy who has switched sides",
+    "Amnesiac with a mysterious past",
+    "Born with a rare and dangerous ability",
+    "Raised in isolation, now discovering the world",
+    "Former noble who lost everything",
+    "Apprentice who surpassed their master",
+    "Cursed with immortality"
+])
+
+DEFAULT_LOCATIONS = _freeze([
+    ("Central City", "The main hub of civilization", "city"),
+    ("Wild Frontier", "Untamed lands full of danger", "wilderness"),
+    ("Ancient Ruins", "Remnants of a lost civilization", "ruins"),
+    ("Sacred Site", "Place of great spiritual power", "temple"),
+    ("Border Outpost", "Settlement at the edge of known territory", "outpost"),
+    ("Hidden Valley", "Secluded area with unique ecosystem", "valley")
+])
+
+DEFAULT_LOCATION_DATA = tuple(LocationData(*loc) for loc in DEFAULT_LOCATIONS)
+
+DEFAULT_STORY_ARC = _freeze({
+    "title": "The Great Journey",
+    "phases": [
+        "The call to adventure and gathering allies",
+        "Journey through dangerous lands facing trials",
+        "Confrontation with the main antagonist",
+        "Resolution and return transformed"
     ]
+})
+
+# Genre template packs: one JSON (or, with PyYAML installed, YAML) file per
+# genre in TEMPLATE_DIR, compiled into a GenrePack of tuples. A background
+# thread re-reads the directory when it changes, so genres can be added or
+# edited without restarting the server.
+TEMPLATE_SUFFIXES = (".json", ".yaml", ".yml")
+
+class GenrePack:
+    """One genre's generator tables, compiled for O(1) random picks."""
     
-    backstories = [
-        "Exiled from their homeland for a crime they didn't commit",
-        "Last surviving member of a destroyed order or family",
-        "Chosen by fate to wield a powerful artifact",
-        "Former enemy who has switched sides",
-        "Amnesiac with a mysterious past",
-        "Born with a rare and dangerous ability",
-        "Raised in isolation, now discovering the world",
-        "Former noble who lost everything",
-        "Apprentice who surpassed their master",
-        "Cursed with immortality"
-    ]
+    __slots__ = ("genre", "settings", "conflicts", "world_names", "first_names", "last_names", "locations", "story_arc")
+    
+    def __init__(self, genre: Optional[str], settings: tuple, conflicts: tuple, world_names: tuple,
+                 first_names: tuple, last_names: tuple, locations: tuple, story_arc: Mapping[str, Any]):
+        self.genre = genre
+        self.settings = settings
+        self.conflicts = conflicts
+        self.world_names = world_names
+        self.first_names = first_names
+        self.last_names = last_names
+        self.locations = locations
+        self.story_arc = story_arc
+
+def _pack_strings(data: Mapping[str, Any], key: str, source: str, default: Optional[tuple] = None) -> tuple:
+    value = data.get(key)
+    if value is None and default is not None:
+        return default
+    if not isinstance(value, list) or not value or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{source}: '{key}' must be a non-empty list of strings")
+    return tuple(value)
+
+def compile_pack(data: Any, source: str) -> GenrePack:
+    """Validate one parsed pack file and build its GenrePack; raises ValueError naming `source`.
+    
+    `first_names` and `last_names` are required; `settings`, `conflicts`,
+    `world_names`, `locations` and `story_arc` fall back to the defaults.
+    Other keys are ignored.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"{source}: a template pack must be an object")
+    genre = data.get("genre") or os.path.splitext(os.path.basename(source))[0]
+    
+    locations = DEFAULT_LOCATION_DATA
+    if data.get("locations") is not None:
+        try:
+            locations = tuple(LocationData(loc["name"], loc["description"], loc["type"]) for loc in data["locations"])
+        except (KeyError, TypeError):
+            raise ValueError(f"{source}: every location needs a name, description and type")
+    
+    story_arc = DEFAULT_STORY_ARC
+    if data.get("story_arc") is not None:
+        arc = data["story_arc"]
+        if not isinstance(arc, dict) or not isinstance(arc.get("title"), str):
+            raise ValueError(f"{source}: 'story_arc' needs a title and phases")
+        story_arc = _freeze({"title": arc["title"], "phases": _pack_strings(arc, "phases", source)})
     
-    return Character(
-        name=name,
-        role=role,
-        personality=personalities.get(role, "Complex and multifaceted"),
-        motivation=random.choice(motivations),
-        backstory=random.choice(backstories)
+    return GenrePack(
+        genre,
+        _pack_strings(data, "settings", source, DEFAULT_SETTINGS),
+        _pack_strings(data, "conflicts", source, DEFAULT_CONFLICTS),
+        _pack_strings(data, "world_names", source, DEFAULT_WORLD_NAMES),
+        # Deduplicated, so distinct index pairs always give distinct full names
+        tuple(dict.fromkeys(_pack_strings(data, "first_names", source))),
+        tuple(dict.fromkeys(_pack_strings(data, "last_names", source))),
+        locations,
+        story_arc,
     )
 
-def generate_locations(genre: str, count: int = 4) -> List[Location]:
-    locations_data = {
-        "sci-fi": [
-            ("The Crystal Dunes", "Vast desert with glowing crystalline formations", "desert"),
-            ("Neo-Acropolis", "Floating city built on ancient ruins", "city"),
-            ("The Bio-Domes", "Artificial ecosystems containing alien flora", "research"),
-            ("The Scrap Yards", "Massive junkyard of starships and technology", "industrial"),
-            ("Orbital Station Alpha", "Space station serving as a trade hub", "space station"),
-            ("The Quantum Core", "Mysterious facility studying reality manipulation", "research"),
-            ("Neon District", "Cyberpunk city sector with holographic advertisements", "city"),
-            ("The Void Gate", "Ancient portal to unknown dimensions", "portal")
-        ],
-        "fantasy": [
-            ("The Whispering Woods", "Ancient forest where trees communicate", "forest"),
-            ("Dragon's Peak", "Mountain fortress carved by ancient dragons", "mountain"),
-            ("The Sunken City", "Ruined metropolis beneath the waves", "ruins"),
-            ("The Crystal Caverns", "Underground network of glowing crystals", "caves"),
-            ("The Floating Isles", "Islands suspended in the sky by ancient magic", "sky"),
-            ("The Enchanted Library", "Infinite repository of magical knowledge", "library"),
-            ("The Cursed Swamp", "Dangerous marshland filled with dark creatures", "swamp"),
-            ("The Celestial Temple", "Sacred site where gods once walked", "temple")
-        ],
-        "steampunk": [
-            ("The Clockwork City", "Metropolis powered by intricate gears and steam", "city"),
-            ("Ironclad Harbor", "Massive port for steam-powered naval vessels", "port"),
-            ("The Aether Works", "Factory harnessing mysterious energy sources", "factory"),
-            ("Skyward Station", "Aerial docking platform for airships", "station"),
-            ("The Underground Foundry", "Massive forge deep beneath the city", "forge"),
-            ("Brass Quarter", "District of artisans and inventors", "district"),
-            ("Steam Gardens", "Greenhouses powered by geothermal vents", "garden"),
-            ("The Gearwork Cathedral", "Grand temple dedicated to the machine god", "temple")
-        ]
-    }
+def read_pack_file(path: str) -> Any:
+    """Parse a pack file; raises ValueError naming the file when it cannot be parsed."""
+    with open(path, "rb") as file:
+        if path.endswith(".json"):
+            try:
+                return orjson.loads(file.read())
+            except orjson.JSONDecodeError as e:
+                raise ValueError(f"{path}: {e}") from e
+        try:
+            import yaml  # YAML template packs are optional
+        except ImportError:
+            raise ValueError(f"{path}: install PyYAML to load YAML template packs")
+        try:
+            return yaml.safe_load(file)
+        except yaml.YAMLError as e:
+            raise ValueError(f"{path}: {e}") from e
+
+class TemplateRegistry:
+    """Compiled genre packs from a directory, swapped in whole when the files change.
     
-    default_locations = [
-        ("Central City", "The main hub of civilization", "city"),
-        ("Wild Frontier", "Untamed lands full of danger", "wilderness"),
-        ("Ancient Ruins", "Remnants of a lost civilization", "ruins"),
-        ("Sacred Site", "Place of great spiritual power", "temple"),
-        ("Border Outpost", "Settlement at the edge of known territory", "outpost"),
-        ("Hidden Valley", "Secluded area with unique ecosystem", "valley")
-    ]
+    Generators only look a genre up in `packs`. A reload compiles a complete
+    new mapping before replacing it, so requests never see a half-loaded
+    registry, and a broken file leaves the previous packs in place. The
+    directory is first read on first use (or by `ensure_loaded`), not when
+    the registry is created.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._packs: Mapping[str, GenrePack] = MappingProxyType({})
+        self._genres: tuple = ()
+        self._default: Optional[GenrePack] = None
+        self._snapshot: Optional[tuple] = None
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def ensure_loaded(self) -> None:
+        if self._snapshot is None:
+            with self._load_lock:
+                if self._snapshot is None:
+                    self.load()
     
-    locs = locations_data.get(genre, default_locations)
-    return [Location(name=name, description=desc, type=type_) for name, desc, type_ in locs[:count]]
+    @property
+    def packs(self) -> Mapping[str, GenrePack]:
+        self.ensure_loaded()
+        return self._packs
+    
+    @property
+    def genres(self) -> tuple:
+        self.ensure_loaded()
+        return self._genres
+    
+    @property
+    def default(self) -> GenrePack:
+        self.ensure_loaded()
+        return self._default
+    
+    def get(self, genre: str) -> GenrePack:
+        """The pack for `genre`, or the built-in defaults for an unknown genre."""
+        self.ensure_loaded()
+        return self._packs.get(genre, self._default)
+    
+    def _scan(self) -> tuple:
+        # Names, mtimes and sizes: cheap enough to poll, and changes with any edit
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(TEMPLATE_SUFFIXES) and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(sorted(entries))
+    
+    def load(self, snapshot: Optional[tuple] = None) -> None:
+        """Compile every pack in the directory; raises ValueError on an invalid or duplicate pack."""
+        snapshot = snapshot if snapshot is not None else self._scan()
+        packs = {}
+        for name, _, _ in snapshot:
+            path = os.path.join(self.directory, name)
+            pack = compile_pack(read_pack_file(path), path)
+            if pack.genre in packs:
+                raise ValueError(f"{path}: genre {pack.genre!r} is already defined by another pack")
+            packs[pack.genre] = pack
+        if not packs:
+            raise ValueError(f"No template packs found in {self.directory}")
+        
+        # Unknown genres get the default tables, with names from fantasy (or the first pack)
+        names = packs.get("fantasy") or packs[min(packs)]
+        self._default = GenrePack(
+            None, DEFAULT_SETTINGS, DEFAULT_CONFLICTS, DEFAULT_WORLD_NAMES,
+            names.first_names, names.last_names, DEFAULT_LOCATION_DATA, DEFAULT_STORY_ARC
+        )
+        self._genres = tuple(sorted(packs))
+        self._packs = MappingProxyType(packs)
+        self._snapshot = snapshot
+    
+    def reload_if_changed(self) -> bool:
+        """Reload when any pack file was added, removed or modified; True if packs changed."""
+        try:
+            snapshot = self._scan()
+        except OSError as e:
+            logger.error("Cannot read template directory %s: %s", self.directory, e)
+            return False
+        if snapshot == self._snapshot:
+            return False
+        try:
+            self.load(snapshot)
+        except Exception as e:
+            # Keep serving the previous packs; try again once the files change
+            self._snapshot = snapshot
+            logger.error("Template reload failed, keeping the previous packs: %s", e)
+            return False
+        logger.info("Reloaded %d template packs from %s", len(self._packs), self.directory)
+        return True
+    
+    def watch(self, interval: float) -> None:
+        """Check for changed packs every `interval` seconds in a daemon thread (0 disables)."""
+        if interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, args=(interval,), name="template-reload", daemon=True)
+        self._thread.start()
+    
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.reload_if_changed()
+    
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
 
-def generate_story_arc(theme: str, genre: str, complexity: str) -> Dict[str, Any]:
-    complexity_multiplier = get_complexity_multiplier(complexity)
-    phase_count = complexity_multiplier["phases"]
-    
-    arcs = {
-        "sci-fi": {
-            "title": "The Quantum Awakening",
-            "phases": [
-                "Discovery of ancient alien technology",
-                "Race against rival factions to control the technology",
-                "Uncovering the true purpose of the ancient civilization",
-                "Final confrontation and choice about the technology's fate",
-                "Aftermath and new galactic order"
-            ]
-        },
-        "fantasy": {
-            "title": "The Shattered Crown",
-            "phases": [
-                "Finding the first fragment of an ancient artifact",
-                "Journey to recover remaining fragments from dangerous locations",
-                "Learning the true history and purpose of the artifact",
-                "Final battle to prevent the artifact from falling into wrong hands",
-                "Restoration and the dawn of a new age"
-            ]
-        },
-        "steampunk": {
-            "title": "The Clockwork Conspiracy",
-            "phases": [
-                "Discovery of a secret society's plot",
-                "Infiltration of the enemy's stronghold",
-                "Uncovering the mastermind behind the conspiracy",
-                "Race to stop the catastrophic plan",
-                "Rebuilding and reforming society"
-            ]
-        }
-    }
+template_registry = TemplateRegistry(settings.template_dir)
+
+class CompiledTemplate:
+    """A `{field}` template pre-parsed once into a positional %-format string."""
     
-    default_arc = {
-        "title": "The Great Journey",
-        "phases": [
-            "The call to adventure and gathering allies",
-            "Journey through dangerous lands facing trials",
-            "Confrontation with the main antagonist",
-            "Resolution and return transformed"
-        ]
-    }
+    __slots__ = ("source", "fmt", "fields", "_getter")
+    
+    def __init__(self, source: str):
+        parts, fields = [], []
+        for literal, field, _, _ in string.Formatter().parse(source):
+            parts.append(literal.replace("%", "%%"))
+            if field is not None:
+                parts.append("%s")
+                fields.append(field)
+        self.source = source
+        self.fmt = "".join(parts)
+        self.fields = tuple(fields)
+        # itemgetter returns a bare value (not a 1-tuple) for a single field
+        getter = itemgetter(*fields) if fields else (lambda values: ())
+        self._getter = getter if len(fields) != 1 else (lambda values: (getter(values),))
+    
+    def render(self, values: Mapping[str, str]) -> str:
+        return self.fmt % self._getter(values)
+
+# Each dialogue template is pre-joined and pre-parsed, so rendering a dialogue
+# is one %-format call instead of a str.format per line plus a join.
+DIALOGUE_TEMPLATES = tuple(CompiledTemplate("\n".join(lines)) for lines in (
+    [
+        "{char1}: 'I've seen what lies beyond the horizon. It changes a person.'",
+        "{char2}: 'Some things shouldn't be seen. Some knowledge corrupts.'",
+        "{char1}: 'Is ignorance truly better than terrible truth?'",
+        "{char2}: 'When the truth can shatter worlds, yes. Sometimes mercy means forgetting.'"
+    ],
+    [
+        "{char1}: 'The path ahead is treacherous, but necessary.'",
+        "{char2}: 'Every path has its cost. Are you willing to pay it?'",
+        "{char1}: 'Some prices are worth paying for the greater good.'",
+        "{char2}: 'The greater good... a convenient excuse for many things.'"
+    ],
+    [
+        "{char1}: 'We cannot turn back now, not after all we've sacrificed.'",
+        "{char2}: 'Perhaps that's exactly why we should reconsider.'",
+        "{char1}: 'Doubt is the enemy of progress.'",
+        "{char2}: 'And blind faith is the architect of disaster.'"
+    ]
+))
+
+ART_PROMPT_WORLD = CompiledTemplate("epic {genre} landscape of {title}, {summary}, dramatic lighting, cinematic, detailed, vibrant colors")
+ART_PROMPT_CHARACTER = CompiledTemplate("{role} character {name} in {title}, {genre} setting, {personality}, detailed costume, dynamic pose, character portrait")
+ART_PROMPT_LOCATION = CompiledTemplate("{type} location {name} in {title}, {description}, {genre} style, atmospheric, detailed environment")
+ART_PROMPT_SCENE = CompiledTemplate("scene from {title}, {genre} world, dramatic composition, highly detailed, professional artwork")
+ART_PROMPTS = (ART_PROMPT_WORLD, ART_PROMPT_CHARACTER, ART_PROMPT_LOCATION, ART_PROMPT_SCENE)
+
+def get_complexity_multiplier(complexity: str) -> Mapping[str, int]:
+    """Returns multipliers based on complexity level."""
+    return COMPLEXITY_MULTIPLIERS.get(complexity, COMPLEXITY_MULTIPLIERS["medium"])
+
+def generate_world_name(genre: str, rng: Optional[random.Random] = None) -> str:
+    return (rng or random).choice(template_registry.get(genre).world_names)
+
+def sample_distinct(rng: random.Random, population: int, count: int) -> List[int]:
+    """`count` indices into range(population), with no repeats until all have been used.
+    
+    random.sample over a range draws without replacement in O(count) time and
+    memory, without building the range. Beyond `population` draws the range
+    is sampled again, so repeats are spread evenly.
+    """
+    picks = []
+    while count > 0:
+        take = min(count, population)
+        picks.extend(rng.sample(range(population), take))
+        count -= take
+    return picks
+
+def generate_characters(count: int, genre: str, rng: Optional[random.Random] = None) -> List[CharacterData]:
+    """`count` characters cycling through the archetypes, with distinct names, motivations and backstories.
     
-    arc = arcs.get(genre, default_arc)
+    Full names are drawn without replacement from the (first, last) product
+    of the genre's name pools, addressed by index as `first * len(last) + last`,
+    so the product is never built and no duplicate checks are needed.
+    Motivations and backstories only repeat once every one has been used.
+    """
+    rng = rng or random
+    pack = template_registry.get(genre)
+    return assemble_characters(
+        pack,
+        sample_distinct(rng, len(pack.first_names) * len(pack.last_names), count),
+        sample_distinct(rng, len(MOTIVATIONS), count),
+        sample_distinct(rng, len(BACKSTORIES), count)
+    )
+
+def assemble_characters(pack: GenrePack, names: List[int], motivations: List[int], backstories: List[int]) -> List[CharacterData]:
+    """Build characters from drawn indices: name pair indices into the pack's pools, table indices for the rest."""
+    first_names, last_names = pack.first_names, pack.last_names
+    characters = []
+    for i, name in enumerate(names):
+        role = ARCHETYPE_ROLES[i % len(ARCHETYPE_ROLES)]
+        first, last = divmod(name, len(last_names))
+        characters.append(CharacterData(
+            f"{first_names[first]} {last_names[last]}",
+            role,
+            PERSONALITIES.get(role, DEFAULT_PERSONALITY),
+            MOTIVATIONS[motivations[i]],
+            BACKSTORIES[backstories[i]]
+        ))
+    return characters
+
+def generate_locations(genre: str, count: int = 4) -> List[LocationData]:
+    # Locations are fixed per genre; the instances are shared and never mutated
+    return list(template_registry.get(genre).locations[:count])
+
+def generate_story_arc(theme: str, genre: str, complexity: str) -> Dict[str, Any]:
+    phase_count = get_complexity_multiplier(complexity)["phases"]
+    arc = template_registry.get(genre).story_arc
     return {
         "title": arc["title"],
-        "phases": arc["phases"][:phase_count]
+        "phases": list(arc["phases"][:phase_count])
     }
 
-def generate_dialogues(characters: List[Character], count: int = 2) -> List[Dict[str, str]]:
+def generate_dialogues(characters: List[CharacterData], count: int = 2, rng: Optional[random.Random] = None) -> List[Dict[str, str]]:
+    rng = rng or random
+    return assemble_dialogues(characters, [rng.choice(DIALOGUE_TEMPLATES) for _ in range(min(count, len(characters)))])
+
+def assemble_dialogues(characters: List[CharacterData], templates: List[CompiledTemplate]) -> List[Dict[str, str]]:
+    """Render one dialogue per template between each character and the next."""
     dialogues = []
-    dialogue_count = min(count, len(characters))
-    
-    dialogue_templates = [
-        [
-            "{char1}: 'I've seen what lies beyond the horizon. It changes a person.'",
-            "{char2}: 'Some things shouldn't be seen. Some knowledge corrupts.'",
-            "{char1}: 'Is ignorance truly better than terrible truth?'",
-            "{char2}: 'When the truth can shatter worlds, yes. Sometimes mercy means forgetting.'"
-        ],
-        [
-            "{char1}: 'The path ahead is treacherous, but necessary.'",
-            "{char2}: 'Every path has its cost. Are you willing to pay it?'",
-            "{char1}: 'Some prices are worth paying for the greater good.'",
-            "{char2}: 'The greater good... a convenient excuse for many things.'"
-        ],
-        [
-            "{char1}: 'We cannot turn back now, not after all we've sacrificed.'",
-            "{char2}: 'Perhaps that's exactly why we should reconsider.'",
-            "{char1}: 'Doubt is the enemy of progress.'",
-            "{char2}: 'And blind faith is the architect of disaster.'"
-        ]
-    ]
-    
-    for i in range(dialogue_count):
+    for i, template in enumerate(templates):
         char1 = characters[i]
         char2 = characters[(i + 1) % len(characters)]
-        
-        template = random.choice(dialogue_templates)
-        dialogue_lines = [line.format(char1=char1.name, char2=char2.name) for line in template]
-        
         dialogues.append({
             "characters": f"{char1.name} and {char2.name}",
-            "dialogue": "\n".join(dialogue_lines)
+            "dialogue": template.render({"char1": char1.name, "char2": char2.name})
         })
     
     return dialogues
 
-def generate_art_prompts(world: StoryWorld, genre: str, count: int = 5) -> List[str]:
-    prompts = []
+def generate_art_prompts(world: WorldData, genre: str, count: int = 5, templates: tuple = ART_PROMPTS) -> List[str]:
+    """Prompts for the world, its first characters and locations, padded with scene prompts.
+    
+    `templates` is the (world, character, location, scene) quartet; compact
+    rows pass the one from their own template version.
+    """
+    world_prompt, character_prompt, location_prompt, scene_prompt = templates
+    title = world.title
     
     # World overview prompt
-    prompts.append(f"epic {genre} landscape of {world.title}, {world.summary}, dramatic lighting, cinematic, detailed, vibrant colors")
+    prompts = [world_prompt.render({"genre": genre, "title": title, "summary": world.summary})]
     
     # Character prompts
-    for char in world.characters[:min(2, len(world.characters))]:
-        prompts.append(f"{char.role} character {char.name} in {world.title}, {genre} setting, {char.personality}, detailed costume, dynamic pose, character portrait")
+    for char in world.characters[:2]:
+        prompts.append(character_prompt.render({"role": char.role, "name": char.name, "title": title, "genre": genre, "personality": char.personality}))
     
     # Location prompts
-    for loc in world.locations[:min(2, len(world.locations))]:
-        prompts.append(f"{loc.type} location {loc.name} in {world.title}, {loc.description}, {genre} style, atmospheric, detailed environment")
+    for loc in world.locations[:2]:
+        prompts.append(location_prompt.render({"type": loc.type, "name": loc.name, "title": title, "description": loc.description, "genre": genre}))
     
     # Additional prompts based on count
-    while len(prompts) < count:
-        prompts.append(f"scene from {world.title}, {genre} world, dramatic composition, highly detailed, professional artwork")
+    if len(prompts) < count:
+        prompts.extend([scene_prompt.render({"title": title, "genre": genre})] * (count - len(prompts)))
     
     return prompts[:count]
 
-@app.post("/generate-world", response_model=StoryWorld, status_code=status.HTTP_201_CREATED)
-@limiter.limit(settings.rate_limit)
-async def generate_storyworld(request: Request, story_request: StoryRequest, db: Session = Depends(get_db)):
-    """
-    Generate a new story world based on the provided parameters.
+def world_summary(theme: str, setting: str, conflict: str) -> str:
+    return f"A {theme} set in a {setting} where {conflict}."
+
+def iter_storyworld_stages(story_request: StoryRequest) -> Iterator[tuple]:
+    """Run the generators for a request, yielding `(stage, value)` as each one finishes.
     
-    - **theme**: The central theme for the story world (3-500 characters)
-    - **genre**: The genre of the story world (fantasy, sci-fi, or steampunk)
-    - **complexity**: The complexity level (simple, medium, or complex)
+    Stages come in order: "title" (a `(title, summary)` pair), "characters",
+    "locations", "story_arc", "dialogues", "art_prompts", and finally
+    "world" with the assembled WorldData. Each call uses its own
+    random.Random, seeded from `story_request.seed` when given, so seeded
+    requests are reproducible and concurrent requests never share RNG state.
     """
-    try:
-        logger.info(f"Generating story world: theme='{story_request.theme}', genre='{story_request.genre}', complexity='{story_request.complexity}'")
-        
-        # Get complexity multipliers
-        multipliers = get_complexity_multiplier(story_request.complexity)
-        
-        # Generate world title and summary
-        world_name = generate_world_name(story_request.genre)
-        settings_list = WORLD_TEMPLATES.get(story_request.genre, {}).get('settings', ['mysterious land'])
-        conflicts_list = WORLD_TEMPLATES.get(story_request.genre, {}).get('conflicts', ['ancient forces clash'])
-        summary = f"A {story_request.theme} set in a {random.choice(settings_list)} where {random.choice(conflicts_list)}."
-        
-        # Generate characters
-        characters = []
-        roles = [arch["role"] for arch in CHARACTER_ARCHETYPES[:multipliers["characters"]]]
-        for role in roles:
-            characters.append(generate_character(role, story_request.genre))
-        
-        # Generate locations
+    rng = random.Random(story_request.seed)
+    
+    # Get complexity multipliers
+    multipliers = get_complexity_multiplier(story_request.complexity)
+    
+    # Generate world title and summary
+    with STAGE_TIMERS["name"].time():
+        world_name = generate_world_name(story_request.genre, rng)
+        pack = template_registry.get(story_request.genre)
+        summary = world_summary(story_request.theme, rng.choice(pack.settings), rng.choice(pack.conflicts))
+    yield "title", (world_name, summary)
+    
+    # Generate characters
+    with STAGE_TIMERS["characters"].time():
+        characters = generate_characters(multipliers["characters"], story_request.genre, rng)
+    yield "characters", characters
+    
+    # Generate locations
+    with STAGE_TIMERS["locations"].time():
         locations = generate_locations(story_request.genre, multipliers["locations"])
-        
-        # Generate story arc
+    yield "locations", locations
+    
+    # Generate story arc
+    with STAGE_TIMERS["arc"].time():
         story_arc = generate_story_arc(story_request.theme, story_request.genre, story_request.complexity)
+    yield "story_arc", story_arc
+    
+    # Generate dialogues
+    with STAGE_TIMERS["dialogues"].time():
+        dialogues = generate_dialogues(characters, multipliers["dialogues"], rng)
+    yield "dialogues", dialogues
+    
+    # Generate art prompts from the assembled world, then fill them in
+    world = WorldData(
+        None, world_name, summary, story_request.theme, story_request.genre, story_request.complexity,
+        characters, locations, story_arc, dialogues, [], None
+    )
+    with STAGE_TIMERS["art_prompts"].time():
+        world.art_prompts = generate_art_prompts(world, story_request.genre, multipliers["characters"] + multipliers["locations"])
+    yield "art_prompts", world.art_prompts
+    yield "world", world
+
+def build_storyworld(story_request: StoryRequest) -> WorldData:
+    """Run every generator for a request and return the assembled world."""
+    for _, value in iter_storyworld_stages(story_request):
+        pass
+    return value
+
+# Vectorized batch engine (needs numpy): all random draws for a batch of
+# worlds are made as index arrays first, then strings are built from them.
+VECTOR_CHUNK_KEYS = 1 << 20  # random keys per chunk when ranking a dense population
+VECTOR_DENSE_FACTOR = 64  # population <= factor * count**2 is ranked; larger is drawn directly
+
+np = None  # numpy, imported by load_numpy() the first time a batch is vectorized
+
+def load_numpy():
+    """Import numpy on first use (it is slow to import); None when it is not installed."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+def sample_distinct_rows(rng: "np.random.Generator", population: int, count: int, rows: int) -> "np.ndarray":
+    """Vectorized sample_distinct: a (rows, count) array, each row an independent draw.
+    
+    Small populations are ranked: each row keeps the `count` smallest of
+    `population` fresh uniform keys (whole permutations first when `count`
+    exceeds `population`), in chunks of about VECTOR_CHUNK_KEYS keys. Large
+    populations are drawn with replacement, and the few rows that came out
+    with a repeat are redrawn once with random.sample, so nothing loops.
+    """
+    if population > VECTOR_DENSE_FACTOR * count * count:
+        picks = rng.integers(population, size=(rows, count))
+        ordered = np.sort(picks, axis=1)
+        repeated = np.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1))
+        if len(repeated):
+            fallback = random.Random(int(rng.integers(2 ** 63)))
+            for row in repeated:
+                picks[row] = fallback.sample(range(population), count)
+        return picks
+    
+    picks = np.empty((rows, count), dtype=np.int64)
+    step = max(1, VECTOR_CHUNK_KEYS // population)
+    for lo in range(0, rows, step):
+        hi = min(rows, lo + step)
+        filled = 0
+        while filled < count:
+            take = min(count - filled, population)
+            keys = rng.random((hi - lo, population))
+            if take == population:
+                block = keys.argsort(axis=1)
+            else:
+                block = np.argpartition(keys, take - 1, axis=1)[:, :take]
+                # argpartition leaves the chosen keys unordered; order them to randomize positions
+                block = np.take_along_axis(block, np.take_along_axis(keys, block, axis=1).argsort(axis=1), axis=1)
+            picks[lo:hi, filled:filled + take] = block
+            filled += take
+    return picks
+
+def build_storyworlds_vectorized(story_requests: List[StoryRequest], rng: Optional["np.random.Generator"] = None) -> List[WorldData]:
+    """Build many worlds at once, drawing every random index up front as NumPy arrays.
+    
+    Requests are grouped by (genre, complexity), so a group's world names,
+    settings, conflicts, character names, motivations, backstories and
+    dialogue templates each take one vectorized call. Python only indexes
+    the template pools with the results to build strings. Worlds follow the
+    same distribution as build_storyworld (distinct names included), but a
+    request's `seed` is not used; draws come from `rng`, fresh from OS
+    entropy by default. Output order matches `story_requests`.
+    """
+    load_numpy()
+    rng = rng if rng is not None else np.random.default_rng()
+    worlds: List[Optional[WorldData]] = [None] * len(story_requests)
+    groups: Dict[tuple, List[int]] = {}
+    for i, story_request in enumerate(story_requests):
+        groups.setdefault((story_request.genre, story_request.complexity), []).append(i)
+    
+    for (genre, complexity), positions in groups.items():
+        pack = template_registry.get(genre)
+        multipliers = get_complexity_multiplier(complexity)
+        count, cast = len(positions), multipliers["characters"]
+        world_names = rng.integers(len(pack.world_names), size=count).tolist()
+        settings_picks = rng.integers(len(pack.settings), size=count).tolist()
+        conflicts = rng.integers(len(pack.conflicts), size=count).tolist()
+        names = sample_distinct_rows(rng, len(pack.first_names) * len(pack.last_names), cast, count).tolist()
+        motivations = sample_distinct_rows(rng, len(MOTIVATIONS), cast, count).tolist()
+        backstories = sample_distinct_rows(rng, len(BACKSTORIES), cast, count).tolist()
+        dialogues = rng.integers(len(DIALOGUE_TEMPLATES), size=(count, min(multipliers["dialogues"], cast))).tolist()
+        locations = generate_locations(genre, multipliers["locations"])
+        art_prompt_count = cast + multipliers["locations"]
         
-        # Generate dialogues
-        dialogues = generate_dialogues(characters, multipliers["dialogues"])
+        for j, position in enumerate(positions):
+            theme = story_requests[position].theme
+            characters = assemble_characters(pack, names[j], motivations[j], backstories[j])
+            world = WorldData(
+                None, pack.world_names[world_names[j]],
+                world_summary(theme, pack.settings[settings_picks[j]], pack.conflicts[conflicts[j]]),
+                theme, genre, complexity, characters, list(locations),
+                generate_story_arc(theme, genre, complexity),
+                assemble_dialogues(characters, [DIALOGUE_TEMPLATES[t] for t in dialogues[j]]),
+                [], None
+            )
+            world.art_prompts = generate_art_prompts(world, genre, art_prompt_count)
+            worlds[position] = world
+    return worlds
+
+def world_stages(world: WorldData) -> Iterator[tuple]:
+    """The `(stage, value)` pairs of iter_storyworld_stages for an already built world."""
+    yield "title", (world.title, world.summary)
+    yield "characters", world.characters
+    yield "locations", world.locations
+    yield "story_arc", world.story_arc
+    yield "dialogues", world.dialogues
+    yield "art_prompts", world.art_prompts
+
+# Streamed event name for each item of a list-valued stage
+STAGE_EVENTS = {
+    "characters": "character",
+    "locations": "location",
+    "dialogues": "dialogue",
+    "art_prompts": "art_prompt",
+}
+
+def stage_events(stage: str, value: Any) -> Iterator[tuple]:
+    """Split a finished generation stage into `(event, data)` items for streaming."""
+    if stage == "title":
+        yield "title", {"title": value[0], "summary": value[1]}
+    elif stage == "story_arc":
+        yield "story_arc", {"title": value["title"]}
+        for phase in value["phases"]:
+            yield "arc_phase", phase
+    elif stage in STAGE_EVENTS:
+        for item in value:
+            yield STAGE_EVENTS[stage], item
+
+def ndjson_event(event: str, data: Any) -> bytes:
+    """One line of the /generate-world/stream response."""
+    return orjson.dumps({"event": event, "data": data}) + b"\n"
+
+# Compact storage: almost every string in a world is a copy of a template
+# string, so compact rows store indices into a versioned, interned template
+# table instead, plus the free-form fields (character names, and anything
+# not found in the table). Dialogues and art prompts are stored as "render
+# template j" recipes. Decoding rebuilds the exact document bytes that
+# document mode would have stored.
+def template_table() -> Dict[str, list]:
+    """The current interned template table, built from the code tables and every loaded pack."""
+    strings = [*ARCHETYPE_ROLES, *PERSONALITIES.values(), DEFAULT_PERSONALITY, *MOTIVATIONS, *BACKSTORIES]
+    for pack in [*(template_registry.packs[genre] for genre in template_registry.genres), template_registry.default]:
+        for loc in pack.locations:
+            strings.extend((loc.name, loc.description, loc.type))
+        strings.append(pack.story_arc["title"])
+        strings.extend(pack.story_arc["phases"])
+    return {
+        "strings": list(dict.fromkeys(strings)),
+        "dialogues": [template.source for template in DIALOGUE_TEMPLATES],
+        "art_prompts": [template.source for template in ART_PROMPTS],
+    }
+
+class TemplateCodec:
+    """Encodes worlds against one version of the template table, and decodes them back.
+    
+    An encoded world is an orjson array `[characters, locations, story_arc,
+    dialogues, art_prompts]`. Interned strings become their table index; any
+    other string is stored as-is. Each dialogue is the index of the dialogue
+    template that renders it between characters i and i + 1, and the art
+    prompts are just their count when generate_art_prompts reproduces them.
+    Whatever does not match its recipe is stored literally, so decoding is
+    always exact.
+    """
+    
+    __slots__ = ("version", "strings", "index", "dialogues", "art_prompts")
+    
+    def __init__(self, version: int, table: Mapping[str, list]):
+        self.version = version
+        self.strings = tuple(table["strings"])
+        self.index = {string: i for i, string in enumerate(self.strings)}
+        self.dialogues = tuple(CompiledTemplate(source) for source in table["dialogues"])
+        self.art_prompts = tuple(CompiledTemplate(source) for source in table["art_prompts"])
+    
+    def encode(self, world: WorldData) -> bytes:
+        index = self.index
+        characters = [
+            [char.name, index.get(char.role, char.role), index.get(char.personality, char.personality),
+             index.get(char.motivation, char.motivation), index.get(char.backstory, char.backstory)]
+            for char in world.characters
+        ]
+        locations = [
+            [index.get(loc.name, loc.name), index.get(loc.description, loc.description), index.get(loc.type, loc.type)]
+            for loc in world.locations
+        ]
+        arc = world.story_arc
+        story_arc = [index.get(arc["title"], arc["title"]), [index.get(phase, phase) for phase in arc["phases"]]]
+        dialogues = [self._encode_dialogue(world.characters, i, dialogue) for i, dialogue in enumerate(world.dialogues)]
+        art_prompts = world.art_prompts
+        if generate_art_prompts(world, world.genre, len(art_prompts), self.art_prompts) == art_prompts:
+            art_prompts = len(art_prompts)
+        return orjson.dumps([characters, locations, story_arc, dialogues, art_prompts])
+    
+    def _encode_dialogue(self, characters: List[CharacterData], i: int, dialogue: Dict[str, str]) -> Any:
+        char1, char2 = characters[i], characters[(i + 1) % len(characters)]
+        if dialogue["characters"] == f"{char1.name} and {char2.name}":
+            values = {"char1": char1.name, "char2": char2.name}
+            for j, template in enumerate(self.dialogues):
+                if template.render(values) == dialogue["dialogue"]:
+                    return j
+        return [dialogue["characters"], dialogue["dialogue"]]
+    
+    def decode(self, row) -> bytes:
+        """The document-mode bytes for a compact row (its scalar columns plus the encoded payload)."""
+        strings = self.strings
         
-        # Generate art prompts
-        temp_world = StoryWorld(
-            title=world_name,
-            summary=summary,
-            theme=story_request.theme,
-            genre=story_request.genre,
-            complexity=story_request.complexity,
-            characters=characters,
-            locations=locations,
-            story_arc=story_arc,
-            dialogues=dialogues,
-            art_prompts=[]
-        )
-        art_prompts = generate_art_prompts(temp_world, story_request.genre, multipliers["characters"] + multipliers["locations"])
+        def lookup(value):
+            return strings[value] if isinstance(value, int) else value
         
-        # Create final world object
-        world = StoryWorld(
-            title=world_name,
-            summary=summary,
-            theme=story_request.theme,
-            genre=story_request.genre,
-            complexity=story_request.complexity,
-            characters=characters,
-            locations=locations,
-            story_arc=story_arc,
-            dialogues=dialogues,
-            art_prompts=art_prompts
+        characters, locations, story_arc, dialogues, art_prompts = orjson.loads(row.document)
+        world = WorldData(
+            None, row.title, row.summary, row.theme, row.genre, row.complexity,
+            [CharacterData(name, lookup(role), lookup(personality), lookup(motivation), lookup(backstory))
+             for name, role, personality, motivation, backstory in characters],
+            [LocationData(lookup(name), lookup(description), lookup(type_)) for name, description, type_ in locations],
+            {"title": lookup(story_arc[0]), "phases": [lookup(phase) for phase in story_arc[1]]},
+            [], [], None
         )
-        
-        # Save to database
-        db_world = StoryWorldDB(
-            title=world.title,
-            summary=world.summary,
-            theme=world.theme,
-            genre=world.genre,
-            complexity=world.complexity,
-            characters=json.dumps([char.model_dump() for char in world.characters]),
-            locations=json.dumps([loc.model_dump() for loc in world.locations]),
+        for i, dialogue in enumerate(dialogues):
+            if isinstance(dialogue, int):
+                char1, char2 = world.characters[i], world.characters[(i + 1) % len(world.characters)]
+                world.dialogues.append({
+                    "characters": f"{char1.name} and {char2.name}",
+                    "dialogue": self.dialogues[dialogue].render({"char1": char1.name, "char2": char2.name})
+                })
+            else:
+                world.dialogues.append({"characters": dialogue[0], "dialogue": dialogue[1]})
+        world.art_prompts = (
+            generate_art_prompts(world, world.genre, art_prompts, self.art_prompts)
+            if isinstance(art_prompts, int) else art_prompts
+        )
+        return orjson.dumps({
+            "title": world.title,
+            "summary": world.summary,
+            "theme": world.theme,
+            "genre": world.genre,
+            "complexity": world.complexity,
+            "characters": world.characters,
+            "locations": world.locations,
+            "story_arc": world.story_arc,
+            "dialogues": world.dialogues,
+            "art_prompts": world.art_prompts
+        })
+
+class TemplateCodecs:
+    """TemplateCodec per storyworld_templates version, loaded on first use and kept.
+    
+    `current()` registers the table for the loaded packs the first time it is
+    needed (and again after a pack reload). Versions are keyed by a digest of
+    the table, so every process that loads the same templates shares a version.
+    """
+    
+    def __init__(self, bind):
+        self.bind = bind
+        self._codecs: Dict[int, TemplateCodec] = {}
+        self._current: Optional[TemplateCodec] = None
+        self._current_packs = None
+        self._lock = threading.Lock()
+    
+    def current(self) -> TemplateCodec:
+        packs = template_registry.packs
+        with self._lock:
+            if self._current is None or self._current_packs is not packs:
+                self._current = self._register(template_table())
+                self._current_packs = packs
+            return self._current
+    
+    def get(self, version: int) -> TemplateCodec:
+        codec = self._codecs.get(version)
+        if codec is None:
+            templates = StoryWorldTemplateDB.__table__
+            with self.bind.connect() as conn:
+                body = conn.scalar(select(templates.c.body).where(templates.c.version == version))
+            if body is None:
+                raise LookupError(f"Unknown template version {version}")
+            codec = self._codecs.setdefault(version, TemplateCodec(version, orjson.loads(body)))
+        return codec
+    
+    def _register(self, table: Mapping[str, list]) -> TemplateCodec:
+        body = orjson.dumps(table)
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        templates = StoryWorldTemplateDB.__table__
+        query = select(templates.c.version).where(templates.c.digest == digest)
+        with self.bind.connect() as conn:
+            version = conn.scalar(query)
+        if version is None:
+            try:
+                with self.bind.begin() as conn:
+                    version = conn.execute(insert(templates).values(digest=digest, body=body)).inserted_primary_key[0]
+                logger.info("Registered template version %d", version)
+            except IntegrityError:
+                # Another process registered the same table first
+                with self.bind.connect() as conn:
+                    version = conn.scalar(query)
+        return self._codecs.setdefault(version, TemplateCodec(version, table))
+
+template_codecs = TemplateCodecs(engine)
+
+def storyworld_to_row(world: WorldData) -> Dict[str, Any]:
+    """Serialize a world into the column values stored in StoryWorldDB."""
+    row = {
+        "title": world.title,
+        "summary": world.summary,
+        "theme": world.theme,
+        "genre": world.genre,
+        "complexity": world.complexity
+    }
+    if settings.storage_mode == "compact":
+        codec = template_codecs.current()
+        row["document"] = codec.encode(world)
+        row["template_version"] = codec.version
+    elif settings.storage_mode == "document":
+        # Serialized once; reads splice these bytes straight into the response
+        row["document"] = orjson.dumps({
+            **row,
+            "characters": world.characters,
+            "locations": world.locations,
+            "story_arc": world.story_arc,
+            "dialogues": world.dialogues,
+            "art_prompts": world.art_prompts
+        })
+    else:
+        row.update(
+            characters=json.dumps([asdict(char) for char in world.characters]),
+            locations=json.dumps([asdict(loc) for loc in world.locations]),
             story_arc=json.dumps(world.story_arc),
             dialogues=json.dumps(world.dialogues),
             art_prompts=json.dumps(world.art_prompts)
         )
-        db.add(db_world)
-        db.commit()
-        db.refresh(db_world)
+    row["id"] = world.id
+    row["created_at"] = world.created_at
+    return row
+
+def storyworld_json(world: StoryWorldDB) -> bytes:
+    """Render a stored world as StoryWorld JSON without decoding its payload."""
+    if world.template_version is not None:
+        body = template_codecs.get(world.template_version).decode(world)[1:-1]
+    elif world.document is not None:
+        body = world.document[1:-1]
+    else:
+        # Legacy per-column rows hold json.dumps text (spaced, ASCII-escaped).
+        # Re-encode it with orjson so the bytes, and therefore the ETag, match
+        # what the world was served with when it was created.
+        body = b",".join((
+            b'"title":' + orjson.dumps(world.title),
+            b'"summary":' + orjson.dumps(world.summary),
+            b'"theme":' + orjson.dumps(world.theme),
+            b'"genre":' + orjson.dumps(world.genre),
+            b'"complexity":' + orjson.dumps(world.complexity),
+            b'"characters":' + orjson.dumps(orjson.loads(world.characters)),
+            b'"locations":' + orjson.dumps(orjson.loads(world.locations)),
+            b'"story_arc":' + orjson.dumps(orjson.loads(world.story_arc)),
+            b'"dialogues":' + orjson.dumps(orjson.loads(world.dialogues)),
+            b'"art_prompts":' + orjson.dumps(orjson.loads(world.art_prompts))
+        ))
+    return b'{"id":%d,%b,"created_at":%b}' % (world.id, body, orjson.dumps(world.created_at))
+
+def storyworlds_json(worlds: List[StoryWorldDB]) -> bytes:
+    return b"[" + b",".join(storyworld_json(world) for world in worlds) + b"]"
+
+def world_search_entry(world: WorldData) -> Dict[str, Any]:
+    return search_entry(
+        world.id, world.title, world.summary, world.theme,
+        [char.name for char in world.characters],
+        [loc.name for loc in world.locations]
+    )
+
+def adjust_world_counts(db: Session, deltas: Counter) -> None:
+    """Apply (genre, complexity) -> delta changes to storyworld_counts (same transaction)."""
+    for (genre, complexity), delta in deltas.items():
+        result = db.execute(
+            update(StoryWorldCountDB)
+            .where(StoryWorldCountDB.genre == genre, StoryWorldCountDB.complexity == complexity)
+            .values(count=StoryWorldCountDB.count + delta)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(StoryWorldCountDB).values(genre=genre, complexity=complexity, count=max(delta, 0)))
+
+def assign_identity(worlds: List[WorldData], db: Optional[Session] = None) -> None:
+    """Give worlds without one an ID and a created_at timestamp.
+    
+    With `db` the IDs are reserved in its transaction (no gaps); without, they
+    come from this process's block, for worlds queued before they are written.
+    """
+    missing = [world for world in worlds if world.id is None]
+    if not missing:
+        return
+    # Stored naive (UTC), which is also how the database hands it back
+    created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    ids = id_allocator.reserve(db, len(missing)) if db is not None else id_allocator.allocate(len(missing))
+    for world, world_id in zip(missing, ids):
+        world.id = world_id
+        world.created_at = created_at
+
+def write_storyworld_rows(db: Session, rows: List[Dict[str, Any]], entries: List[Dict[str, Any]], deltas: Counter) -> None:
+    """Insert serialized rows, their full-text entries and the count changes in one transaction."""
+    try:
+        with STAGE_TIMERS["persistence"].time():
+            db.execute(insert(StoryWorldDB), rows)
+            if SEARCH_INDEX_ENABLED and entries:
+                db.execute(SEARCH_INSERT_SQL, entries)
+            adjust_world_counts(db, deltas)
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+def insert_storyworlds(db: Session, worlds: List[WorldData]) -> List[int]:
+    """Insert worlds in a single executemany/transaction, returning their IDs in input order."""
+    assign_identity(worlds, db)
+    with STAGE_TIMERS["serialization"].time():
+        rows = [storyworld_to_row(world) for world in worlds]
+        entries = [world_search_entry(world) for world in worlds] if SEARCH_INDEX_ENABLED else []
+    write_storyworld_rows(db, rows, entries, Counter((world.genre, world.complexity) for world in worlds))
+    return [world.id for world in worlds]
+
+def store_storyworlds(worlds: List[WorldData]) -> List[int]:
+    """insert_storyworlds in a session of its own, for callers outside a request's get_db."""
+    with SessionLocal() as db:
+        return insert_storyworlds(db, worlds)
+
+class WriteBehindQueue:
+    """Bounded queue of generated worlds flushed to the database in batches.
+    
+    Worlds already carry their ID and created_at when queued, so clients get
+    them back immediately; `pending` holds them until their batch commits so
+    reads can see them in the meantime. A full queue applies backpressure:
+    `put` waits up to `timeout` seconds and then raises asyncio.TimeoutError.
+    """
+    
+    RETRIES = 5
+    
+    def __init__(self, maxsize: int, batch_size: int, timeout: float):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.pending: Dict[int, WorldData] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        self._queue = asyncio.Queue(self.maxsize)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def put(self, world: WorldData) -> None:
+        # Register before enqueuing: once queued, _run may flush the world and
+        # pop it from pending before this coroutine resumes (always, when
+        # DB_OFFLOAD is off and the write runs inline)
+        self.pending[world.id] = world
+        WRITE_BEHIND_PENDING.inc()
+        try:
+            await asyncio.wait_for(self._queue.put(world), self.timeout)
+        except asyncio.TimeoutError:
+            self.pending.pop(world.id, None)
+            WRITE_BEHIND_PENDING.dec()
+            raise
+    
+    async def drain(self) -> None:
+        """Wait until everything queued so far has been written."""
+        if self._queue is not None:
+            await self._queue.join()
+    
+    async def stop(self) -> None:
+        await self.drain()
+        if self._task is not None:
+            self._task.cancel()
+    
+    async def _run(self) -> None:
+        while True:
+            # Whatever piled up while the previous batch was committing goes next
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._flush(batch)
+            finally:
+                for world in batch:
+                    self.pending.pop(world.id, None)
+                    self._queue.task_done()
+                WRITE_BEHIND_PENDING.dec(len(batch))
+    
+    async def _flush(self, batch: List[WorldData]) -> None:
+        for attempt in range(1, self.RETRIES + 1):
+            try:
+                await run_db(self._write, batch)
+                return
+            except Exception as e:
+                logger.error("Write-behind flush of %d worlds failed (attempt %d): %s", len(batch), attempt, e, exc_info=True)
+                if attempt < self.RETRIES:
+                    await asyncio.sleep(0.1 * 2 ** attempt)
+        logger.error("Dropped %d unwritten worlds: %s", len(batch), [world.id for world in batch])
+    
+    @staticmethod
+    def _write(batch: List[WorldData]) -> None:
+        store_storyworlds(batch)
+
+write_behind = WriteBehindQueue(settings.write_behind_queue_size, settings.write_behind_batch_size, settings.write_behind_enqueue_timeout)
+
+def encode_cursor(world: StoryWorldDB) -> str:
+    """Opaque keyset cursor pointing just past `world` in newest-first order."""
+    raw = f"{world.created_at.isoformat()}|{world.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """Inverse of encode_cursor; raises ValueError for malformed tokens."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, world_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(world_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+def fetch_storyworlds(db: Session, skip: int, limit: int, cursor: Optional[tuple] = None, filters: Optional[list] = None) -> List[StoryWorldDB]:
+    """Newest-first page of worlds, by keyset `cursor` if given, otherwise by offset."""
+    query = select(StoryWorldDB).where(*(filters or [])).order_by(StoryWorldDB.created_at.desc(), StoryWorldDB.id.desc())
+    if cursor is not None:
+        query = query.where(tuple_(StoryWorldDB.created_at, StoryWorldDB.id) < tuple_(*cursor))
+    else:
+        query = query.offset(skip)
+    return list(db.scalars(query.limit(limit)))
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """`value` as naive UTC; naive values are taken to be UTC already."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """The smallest string above every string starting with `prefix`, or None if there is none.
+    
+    Trailing U+10FFFF characters cannot be incremented, so they carry over to
+    the character before them; surrogates are skipped since they cannot be
+    encoded.
+    """
+    stripped = prefix.rstrip(chr(sys.maxunicode))
+    if not stripped:
+        return None
+    code = ord(stripped[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        code = 0xE000
+    return stripped[:-1] + chr(code)
+
+class WorldFilters:
+    """Optional query-string filters shared by the listing, count and export endpoints."""
+    
+    def __init__(
+        self,
+        genre: Optional[str] = None,
+        complexity: Optional[str] = None,
+        theme_prefix: Optional[str] = Query(None, min_length=1, max_length=500),
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ):
+        self.genre = genre
+        self.complexity = complexity
+        self.theme_prefix = theme_prefix
+        # created_at is stored as naive UTC; convert offsets rather than dropping them
+        self.created_after = naive_utc(created_after)
+        self.created_before = naive_utc(created_before)
+    
+    @property
+    def counter_only(self) -> bool:
+        """True when the filters can be answered from storyworld_counts alone."""
+        return self.theme_prefix is None and self.created_after is None and self.created_before is None
+    
+    def clauses(self) -> list:
+        clauses = []
+        if self.genre:
+            clauses.append(StoryWorldDB.genre == self.genre)
+        if self.complexity:
+            clauses.append(StoryWorldDB.complexity == self.complexity)
+        if self.theme_prefix:
+            # A range instead of LIKE 'prefix%' so the theme index is usable
+            clauses.append(StoryWorldDB.theme >= self.theme_prefix)
+            upper = prefix_upper_bound(self.theme_prefix)
+            if upper is not None:
+                clauses.append(StoryWorldDB.theme < upper)
+        if self.created_after:
+            clauses.append(StoryWorldDB.created_at >= self.created_after)
+        if self.created_before:
+            clauses.append(StoryWorldDB.created_at < self.created_before)
+        return clauses
+
+def iter_storyworlds_ndjson(filters: list, chunk_size: int = 1000) -> Iterator[bytes]:
+    """Yield matching worlds as NDJSON chunks, reading rows in batches of `chunk_size`.
+    
+    Rows are fetched as plain Core rows with yield_per, so memory stays
+    constant regardless of how many worlds are exported.
+    """
+    table = StoryWorldDB.__table__
+    query = select(table).where(*filters).order_by(table.c.id)
+    with SessionLocal() as db:
+        result = db.execute(query.execution_options(yield_per=chunk_size))
+        for partition in result.partitions():
+            yield b"".join(storyworld_json(row) + b"\n" for row in partition)
+
+def fetch_storyworld(db: Session, world_id: int) -> Optional[StoryWorldDB]:
+    return db.query(StoryWorldDB).filter(StoryWorldDB.id == world_id).first()
+
+def remove_storyworld(db: Session, world_id: int) -> bool:
+    """Delete a world by ID, returning False if it does not exist."""
+    world = fetch_storyworld(db, world_id)
+    if not world:
+        return False
+    db.delete(world)
+    adjust_world_counts(db, Counter({(world.genre, world.complexity): -1}))
+    if SEARCH_INDEX_ENABLED:
+        db.execute(text("DELETE FROM storyworlds_fts WHERE rowid = :id"), {"id": world_id})
+    db.commit()
+    return True
+
+def count_storyworlds(db: Session, filters: WorldFilters) -> int:
+    """Count matching worlds from storyworld_counts when possible, else via the filter indexes."""
+    if filters.counter_only:
+        query = select(func.coalesce(func.sum(StoryWorldCountDB.count), 0))
+        if filters.genre:
+            query = query.where(StoryWorldCountDB.genre == filters.genre)
+        if filters.complexity:
+            query = query.where(StoryWorldCountDB.complexity == filters.complexity)
+        return db.scalar(query)
+    return db.scalar(select(func.count()).select_from(StoryWorldDB).where(*filters.clauses()))
+
+def fts_query(query: str) -> str:
+    """Turn free text into a safe FTS5 query: every word must match, the last as a prefix."""
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    return " ".join(f'"{term}"' for term in terms) + "*"
+
+def search_storyworlds(db: Session, query: str, skip: int, limit: int) -> List[StoryWorldDB]:
+    """Best-matching worlds first (bm25 over the FTS index, or LIKE without SQLite)."""
+    if not SEARCH_INDEX_ENABLED:
+        pattern = f"%{query}%"
+        clauses = [column.ilike(pattern) for column in (StoryWorldDB.title, StoryWorldDB.summary, StoryWorldDB.theme)]
+        stmt = (select(StoryWorldDB).where(or_(*clauses))
+                .order_by(StoryWorldDB.created_at.desc(), StoryWorldDB.id.desc()).offset(skip).limit(limit))
+        return list(db.scalars(stmt))
+    
+    ids = list(db.scalars(text(
+        f"SELECT rowid FROM storyworlds_fts WHERE storyworlds_fts MATCH :query "
+        f"ORDER BY bm25(storyworlds_fts, {SEARCH_WEIGHTS}) LIMIT :limit OFFSET :skip"
+    ), {"query": fts_query(query), "limit": limit, "skip": skip}))
+    worlds = {world.id: world for world in db.scalars(select(StoryWorldDB).where(StoryWorldDB.id.in_(ids)))}
+    return [worlds[world_id] for world_id in ids if world_id in worlds]
+
+# Fetch and render in one run_db call: decoding compact rows (and the first
+# lookup of a template version) is work for the DB thread pool, not the loop.
+def fetch_storyworlds_json(db: Session, skip: int, limit: int, cursor: Optional[tuple], filters: list) -> tuple:
+    """A page as (JSON array body, X-Next-Cursor or None when the page is not full)."""
+    worlds = fetch_storyworlds(db, skip, limit, cursor, filters)
+    next_cursor = encode_cursor(worlds[-1]) if len(worlds) == limit else None
+    return storyworlds_json(worlds), next_cursor
+
+def search_storyworlds_json(db: Session, query: str, skip: int, limit: int) -> bytes:
+    return storyworlds_json(search_storyworlds(db, query, skip, limit))
+
+def fetch_storyworld_json(db: Session, world_id: int) -> Optional[bytes]:
+    world = fetch_storyworld(db, world_id)
+    return storyworld_json(world) if world is not None else None
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Per-process startup and shutdown: all I/O the app needs happens here, not at import."""
+    configure_logging()
+    # Nothing is served yet, so blocking the loop here is fine
+    if settings.auto_migrate:
+        run_migrations(engine)
+    elif pending_migrations(engine):
+        raise RuntimeError("The database schema is out of date: run `python main.py migrate` or set AUTO_MIGRATE=true")
+    template_registry.ensure_loaded()
+    template_registry.watch(settings.template_reload_interval)
+    if settings.write_behind:
+        write_behind.start()
+    try:
+        yield
+    finally:
+        template_registry.stop()
+        # Durable shutdown: everything already returned to clients gets written
+        if settings.write_behind:
+            await write_behind.stop()
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            prometheus_client.multiprocess.mark_process_dead(os.getpid())
+
+async def persist_storyworld(world: WorldData) -> None:
+    """Save a freshly built world, or hand it to the write-behind queue with an ID assigned now."""
+    if settings.write_behind:
+        await run_db(assign_identity, [world])
+        try:
+            await write_behind.put(world)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="The server is busy saving worlds. Please try again shortly.",
+                headers={"Retry-After": "1"}
+            )
+    else:
+        await run_db(store_storyworlds, [world])
+
+def remember_storyworld(world: WorldData, cache_key: Optional[str]) -> bytes:
+    """Cache a newly saved world for repeat seeded requests and for GET /worlds/{id}; returns its body."""
+    if cache_key:
+        generation_cache.set(cache_key, world)
+    
+    # The creator usually opens the world next; its GET body is these same bytes
+    body = orjson.dumps(world)
+    world_cache.set(world.id, (world_etag(body), body))
+    return body
+
+@router.post("/generate-world", response_model=StoryWorld, status_code=status.HTTP_201_CREATED)
+@limiter.limit(settings.rate_limit)
+async def generate_storyworld(request: Request, story_request: StoryRequest):
+    """
+    Generate a new story world based on the provided parameters.
+    
+    - **theme**: The central theme for the story world (3-500 characters)
+    - **genre**: The genre of the story world (one of `GET /genres`)
+    - **complexity**: The complexity level (simple, medium, complex, or epic)
+    - **seed**: Optional seed; identical seeded requests return the same stored world
+    """
+    try:
+        cache_key = generation_cache_key(story_request)
+        cached = generation_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            return Response(
+                content=orjson.dumps(cached), status_code=status.HTTP_201_CREATED,
+                media_type="application/json", headers={"X-Cache": "HIT"}
+            )
+        
+        request_logger.info(
+            "Generating story world: theme=%r, genre=%r, complexity=%r",
+            story_request.theme[:LOG_THEME_CHARS], story_request.genre, story_request.complexity
+        )
         
-        # Add ID and created_at to response
-        world.id = db_world.id
-        world.created_at = db_world.created_at
+        world = build_storyworld(story_request)
+        await persist_storyworld(world)
+        body = remember_storyworld(world, cache_key)
         
-        logger.info(f"Successfully generated story world with ID: {db_world.id}")
-        return world
+        request_logger.info("Successfully generated story world with ID: %d", world.id, extra={"world_id": world.id})
+        return Response(content=body, status_code=status.HTTP_201_CREATED, media_type="application/json")
         
+    except HTTPException:
+        raise
     except ValueError as e:
-        logger.error(f"Validation error: {str(e)}")
+        logger.error("Validation error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=str(e)
         )
     except Exception as e:
-        logger.error(f"Error generating world: {str(e)}", exc_info=True)
+        logger.error("Error generating world: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while generating the story world. Please try again later."
         )
 
-@app.get("/worlds", response_model=List[StoryWorld])
-@limiter.limit("20/minute")
-async def get_worlds(request: Request, skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
+@router.post(
+    "/generate-world/stream", status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_201_CREATED: {"content": {"application/x-ndjson": {}}}}
+)
+@limiter.limit(settings.rate_limit)
+async def generate_storyworld_stream(request: Request, story_request: StoryRequest):
     """
-    Retrieve a list of generated story worlds.
+    Generate a new story world, streaming each part as newline-delimited JSON as soon as it exists.
+    
+    Takes the same body as `POST /generate-world`. Every line is an object
+    `{"event": ..., "data": ...}`; events arrive in this order:
     
-    - **skip**: Number of worlds to skip (pagination)
-    - **limit**: Maximum number of worlds to return
+    - **title**: `title` and `summary`
+    - **character**, **location**: one line each
+    - **story_arc**: the arc `title`, followed by one **arc_phase** line per phase
+    - **dialogue**, **art_prompt**: one line each
+    - **complete**: `id` and `created_at` once the world is saved
+    
+    If saving fails the stream ends with an **error** line (`detail`) instead of **complete**.
+    """
+    cache_key = generation_cache_key(story_request)
+    cached = generation_cache.get(cache_key) if cache_key else None
+    
+    async def events():
+        if cached is not None:
+            for stage, value in world_stages(cached):
+                for name, data in stage_events(stage, value):
+                    yield ndjson_event(name, data)
+            yield ndjson_event("complete", {"id": cached.id, "created_at": cached.created_at})
+            return
+        
+        request_logger.info(
+            "Streaming story world: theme=%r, genre=%r, complexity=%r",
+            story_request.theme[:LOG_THEME_CHARS], story_request.genre, story_request.complexity
+        )
+        try:
+            for stage, value in iter_storyworld_stages(story_request):
+                if stage == "world":
+                    world = value
+                    break
+                yield b"".join(ndjson_event(name, data) for name, data in stage_events(stage, value))
+                # Let the server flush this stage before generating the next
+                await asyncio.sleep(0)
+            await persist_storyworld(world)
+            remember_storyworld(world, cache_key)
+        except HTTPException as e:
+            yield ndjson_event("error", {"detail": e.detail})
+            return
+        except Exception as e:
+            logger.error("Error streaming world: %s", e, exc_info=True)
+            yield ndjson_event("error", {"detail": "An error occurred while generating the story world. Please try again later."})
+            return
+        
+        request_logger.info("Successfully streamed story world with ID: %d", world.id, extra={"world_id": world.id})
+        yield ndjson_event("complete", {"id": world.id, "created_at": world.created_at})
+    
+    return StreamingResponse(
+        events(), status_code=status.HTTP_201_CREATED, media_type="application/x-ndjson",
+        headers={"X-Cache": "HIT"} if cached is not None else None
+    )
+
+def generate_batch(db: Session, story_requests: List[StoryRequest]) -> tuple:
+    """Build and store a batch of worlds; returns (IDs in request order, number newly generated).
+    
+    Generation is CPU work of up to MAX_BATCH_SIZE worlds, so the endpoint runs
+    all of it on the DB thread pool together with the insert.
+    """
+    # Serve seeded requests from the cache and generate each remaining key once
+    ids: List[Optional[int]] = [None] * len(story_requests)
+    pending: List[tuple] = []  # (cache_key, request positions, world)
+    pending_by_key: Dict[tuple, int] = {}
+    cache_keys = [generation_cache_key(story_request) for story_request in story_requests]
+    unseeded = [story_request for story_request, cache_key in zip(story_requests, cache_keys) if cache_key is None]
+    vectorize = 0 < settings.vectorized_min_batch <= len(unseeded) and load_numpy() is not None
+    for i, (story_request, cache_key) in enumerate(zip(story_requests, cache_keys)):
+        if cache_key is not None:
+            cached = generation_cache.get(cache_key)
+            if cached is not None:
+                ids[i] = cached.id
+                continue
+            if cache_key in pending_by_key:
+                pending[pending_by_key[cache_key]][1].append(i)
+                continue
+            pending_by_key[cache_key] = len(pending)
+        if vectorize and cache_key is None:
+            pending.append((None, [i], None))
+        else:
+            pending.append((cache_key, [i], build_storyworld(story_request)))
+    if vectorize:
+        # Unseeded worlds needn't be reproducible, so their draws can be batched
+        vectorized = iter(build_storyworlds_vectorized(unseeded))
+        pending = [(cache_key, positions, world or next(vectorized)) for cache_key, positions, world in pending]
+    
+    new_worlds = [world for _, _, world in pending]
+    new_ids = insert_storyworlds(db, new_worlds) if new_worlds else []
+    for (cache_key, positions, world), world_id in zip(pending, new_ids):
+        for i in positions:
+            ids[i] = world_id
+        if cache_key is not None:
+            generation_cache.set(cache_key, world)
+    return ids, len(new_ids)
+
+@router.post("/generate-worlds", response_model=BatchGenerateResponse, status_code=status.HTTP_201_CREATED)
+@limiter.limit(settings.batch_rate_limit)
+async def generate_storyworlds(
+    request: Request,
+    story_requests: List[StoryRequest] = Body(..., min_length=1, max_length=settings.max_batch_size),
+    db: Session = Depends(get_db)
+):
+    """
+    Generate many story worlds in one request and persist them in a single transaction.
+    
+    The body is a JSON array of world requests (same fields as `/generate-world`).
+    IDs are returned in the same order as the requests.
     """
     try:
-        worlds = db.query(StoryWorldDB).order_by(StoryWorldDB.created_at.desc()).offset(skip).limit(limit).all()
+        request_logger.info("Generating batch of %d story worlds", len(story_requests))
         
-        result = []
-        for world in worlds:
-            result.append(StoryWorld(
-                id=world.id,
-                title=world.title,
-                summary=world.summary,
-                theme=world.theme,
-                genre=world.genre,
-                complexity=world.complexity,
-                characters=[Character(**char) for char in json.loads(world.characters)],
-                locations=[Location(**loc) for loc in json.loads(world.locations)],
-                story_arc=json.loads(world.story_arc),
-                dialogues=json.loads(world.dialogues),
-                art_prompts=json.loads(world.art_prompts),
-                created_at=world.created_at
-            ))
+        ids, generated = await run_db(generate_batch, db, story_requests)
+        request_logger.info("Successfully generated %d story worlds (%d served from cache)", generated, len(ids) - generated)
+        return BatchGenerateResponse(ids=ids, count=len(ids))
         
-        return result
+    except Exception as e:
+        logger.error("Error generating world batch: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while generating the story worlds. Please try again later."
+        )
+
+@router.get("/worlds", response_model=List[StoryWorld])
+@limiter.limit(settings.read_rate_limit)
+async def get_worlds(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = None,
+    filters: WorldFilters = Depends(),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieve a list of generated story worlds, newest first.
+    
+    - **skip**: Number of worlds to skip (offset pagination, ignored when `cursor` is set)
+    - **limit**: Maximum number of worlds to return (at most `MAX_PAGE_SIZE`)
+    - **cursor**: Token from the previous page's `X-Next-Cursor` header (keyset pagination)
+    - **genre** / **complexity**: Optional exact-match filters
+    - **theme_prefix**: Only worlds whose theme starts with this text (case-sensitive)
+    - **created_after** / **created_before**: Optional ISO-8601 `created_at` range (inclusive / exclusive)
+    """
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    try:
+        body, next_cursor = await run_db(fetch_storyworlds_json, db, skip, limit, position, filters.clauses())
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return Response(content=body, media_type="application/json", headers=headers)
         
     except Exception as e:
-        logger.error(f"Error retrieving worlds: {str(e)}", exc_info=True)
+        logger.error("Error retrieving worlds: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while retrieving story worlds."
         )
 
-@app.get("/worlds/{world_id}", response_model=StoryWorld)
-@limiter.limit("20/minute")
-async def get_world(request: Request, world_id: int, db: Session = Depends(get_db)):
+@router.get("/search", response_model=List[StoryWorld])
+@limiter.limit(settings.read_rate_limit)
+async def search_worlds(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=settings.max_page_size),
+    db: Session = Depends(get_db)
+):
     """
-    Retrieve a specific story world by ID.
+    Full-text search over world titles, summaries, themes, character names and location names.
+    
+    - **q**: Search words; every word must match and the last one matches as a prefix
+    - **skip** / **limit**: Pagination over the ranked results
     """
     try:
-        world = db.query(StoryWorldDB).filter(StoryWorldDB.id == world_id).first()
+        body = await run_db(search_storyworlds_json, db, q, skip, limit)
+        return Response(content=body, media_type="application/json")
         
-        if not world:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Story world not found"
-            )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except Exception as e:
+        logger.error("Error searching worlds for %r: %s", q[:LOG_THEME_CHARS], e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while searching story worlds."
+        )
+
+@router.get("/worlds/count", response_model=WorldCount)
+@limiter.limit(settings.read_rate_limit)
+async def count_worlds(request: Request, filters: WorldFilters = Depends(), db: Session = Depends(get_db)):
+    """
+    Count stored worlds matching the same optional filters as `GET /worlds`.
+    
+    Genre/complexity-only counts are read from a maintained counter table;
+    theme and date filters are counted through the filter indexes.
+    """
+    try:
+        return WorldCount(count=await run_db(count_storyworlds, db, filters))
         
-        return StoryWorld(
-            id=world.id,
-            title=world.title,
-            summary=world.summary,
-            theme=world.theme,
-            genre=world.genre,
-            complexity=world.complexity,
-            characters=[Character(**char) for char in json.loads(world.characters)],
-            locations=[Location(**loc) for loc in json.loads(world.locations)],
-            story_arc=json.loads(world.story_arc),
-            dialogues=json.loads(world.dialogues),
-            art_prompts=json.loads(world.art_prompts),
-            created_at=world.created_at
+    except Exception as e:
+        logger.error("Error counting worlds: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while counting story worlds."
         )
+
+@router.get("/worlds/export")
+@limiter.limit(settings.export_rate_limit)
+async def export_worlds(request: Request, filters: WorldFilters = Depends()):
+    """
+    Stream every stored world as newline-delimited JSON (one StoryWorld per line).
+    
+    Accepts the same optional filters as `GET /worlds`.
+    """
+    logger.info("Exporting story worlds: %s", vars(filters))
+    return StreamingResponse(
+        iter_storyworlds_ndjson(filters.clauses(), settings.export_chunk_size),
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/worlds/{world_id}", response_model=StoryWorld)
+@limiter.limit(settings.read_rate_limit)
+async def get_world(request: Request, world_id: int, db: Session = Depends(get_db)):
+    """
+    Retrieve a specific story world by ID.
+    
+    Responses carry an `ETag`; sending it back in `If-None-Match` returns 304.
+    """
+    try:
+        cached = world_cache.get(world_id)
+        if cached is not None:
+            WORLD_CACHE_HITS.inc()
+        else:
+            WORLD_CACHE_MISSES.inc()
+            pending = write_behind.pending.get(world_id)
+            if pending is not None:
+                body = orjson.dumps(pending)
+            else:
+                body = await run_db(fetch_storyworld_json, db, world_id)
+                if body is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Story world not found"
+                    )
+            cached = (world_etag(body), body)
+            world_cache.set(world_id, cached)
+        
+        etag, body = cached
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error retrieving world {world_id}: {str(e)}", exc_info=True)
+        logger.error("Error retrieving world %d: %s", world_id, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while retrieving the story world."
         )
 
-@app.delete("/worlds/{world_id}", status_code=status.HTTP_204_NO_CONTENT)
-@limiter.limit("10/minute")
+@router.delete("/worlds/{world_id}", status_code=status.HTTP_204_NO_CONTENT)
+@limiter.limit(settings.delete_rate_limit)
 async def delete_world(request: Request, world_id: int, db: Session = Depends(get_db)):
     """
     Delete a story world by ID.
     """
     try:
-        world = db.query(StoryWorldDB).filter(StoryWorldDB.id == world_id).first()
-        
-        if not world:
+        if world_id in write_behind.pending:
+            await write_behind.drain()
+        if not await run_db(remove_storyworld, db, world_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Story world not found"
             )
+        generation_cache.discard_where(lambda world: world.id == world_id)
+        world_cache.discard(world_id)
         
-        db.delete(world)
-        db.commit()
-        
-        logger.info(f"Deleted story world with ID: {world_id}")
+        logger.info("Deleted story world with ID: %d", world_id, extra={"world_id": world_id})
         return None
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting world {world_id}: {str(e)}", exc_info=True)
+        logger.error("Error deleting world %d: %s", world_id, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while deleting the story world."
         )
 
-@app.get("/")
+@router.get("/genres", response_model=GenreList)
+async def list_genres():
+    """Genres accepted by the generate endpoints, one per loaded template pack."""
+    return {"genres": template_registry.genres}
+
+@router.get("/")
 async def root():
     """Root endpoint with API information."""
     return {
@@ -671,22 +2561,256 @@ async def root():
         "version": settings.version,
         "endpoints": {
             "generate_world": "/generate-world (POST)",
+            "generate_world_stream": "/generate-world/stream (POST, NDJSON)",
+            "generate_worlds": "/generate-worlds (POST)",
             "get_worlds": "/worlds (GET)",
+            "count_worlds": "/worlds/count (GET)",
             "get_world": "/worlds/{id} (GET)",
-            "delete_world": "/worlds/{id} (DELETE)"
+            "export_worlds": "/worlds/export (GET)",
+            "search_worlds": "/search?q= (GET)",
+            "delete_world": "/worlds/{id} (DELETE)",
+            "genres": "/genres (GET)",
+            "metrics": "/metrics (GET)"
         }
     }
 
-@app.get("/health")
+@router.get("/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "timestamp": datetime.now(timezone.utc).isoformat()}
 
-if __name__ == "__main__":
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (aggregates across workers when PROMETHEUS_MULTIPROC_DIR is set)."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = prometheus_client.CollectorRegistry()
+        prometheus_client.multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return Response(content=prometheus_client.generate_latest(registry), headers={"Content-Type": prometheus_client.CONTENT_TYPE_LATEST})
+
+def create_app() -> FastAPI:
+    """Build the ASGI app. Cheap and free of I/O; everything else runs in `lifespan`."""
+    application = FastAPI(
+        title=settings.app_name,
+        version=settings.version,
+        debug=settings.debug,
+        # The router's routes as-is: include_router() would rebuild every one
+        routes=router.routes,
+        lifespan=lifespan,
+    )
+    application.state.limiter = limiter
+    application.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+    # Innermost, so request metrics include the time spent compressing
+    application.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size,
+                               encodings=settings.compression_encodings)
+    application.add_middleware(MetricsMiddleware)
+    application.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        # Browser code can only read response headers that are listed here
+        expose_headers=["X-Next-Cursor", "ETag"],
+    )
+    return application
+
+# For `uvicorn main:app`; `uvicorn --factory main:create_app` works as well
+app = create_app()
+
+def export_cli(args) -> None:
+    """Write the NDJSON export to a file (or stdout) without going through HTTP."""
+    filters = WorldFilters(args.genre, args.complexity, args.theme_prefix, args.created_after, args.created_before)
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for chunk in iter_storyworlds_ndjson(filters.clauses(), settings.export_chunk_size):
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+# Offline generation: worker processes build worlds into private SQLite
+# shards (no IDs, no shared state), and the parent merges each finished
+# shard into storyworlds, allocating IDs and updating the search index and
+# counts exactly as insert_storyworlds does.
+SHARD_COLUMNS = (
+    "title", "summary", "theme", "genre", "complexity", "document", "template_version",
+    "characters", "locations", "story_arc", "dialogues", "art_prompts",
+)
+SHARD_NAME_COLUMNS = ("character_names", "location_names")
+
+def generate_shard(path: str, start: int, count: int, theme: str, genres: List[str],
+                   complexity: str, seed: int, batch_size: int, engine: str = "python") -> int:
+    """Build worlds `start`..`start + count - 1` into a new SQLite shard at `path` (runs in a worker).
+    
+    World `i` uses genre `genres[i % len(genres)]`. With the python engine it
+    is seeded with `seed + i`, so the output does not depend on how the range
+    is split across workers. The numpy engine draws each batch from a
+    generator seeded with `(seed, first index of the batch)` instead.
+    """
+    columns = SHARD_COLUMNS + SHARD_NAME_COLUMNS
+    conn = sqlite3.connect(path)
+    try:
+        # Scratch file: durability is pointless, the merge reads it once
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute(f"CREATE TABLE worlds ({', '.join(columns)})")
+        insert_sql = f"INSERT INTO worlds VALUES ({', '.join('?' * len(columns))})"
+        for offset in range(start, start + count, batch_size):
+            indices = range(offset, min(start + count, offset + batch_size))
+            if engine == "numpy":
+                story_requests = [StoryRequest(theme=theme, genre=genres[i % len(genres)], complexity=complexity) for i in indices]
+                worlds = build_storyworlds_vectorized(story_requests, load_numpy().random.default_rng([seed, offset]))
+            else:
+                worlds = [
+                    build_storyworld(StoryRequest(theme=theme, genre=genres[i % len(genres)], complexity=complexity, seed=seed + i))
+                    for i in indices
+                ]
+            rows = []
+            for world in worlds:
+                row = storyworld_to_row(world)
+                rows.append((
+                    *(row.get(column) for column in SHARD_COLUMNS),
+                    orjson.dumps([char.name for char in world.characters]),
+                    orjson.dumps([loc.name for loc in world.locations]),
+                ))
+            conn.executemany(insert_sql, rows)
+            conn.commit()
+    finally:
+        conn.close()
+    return count
+
+def merge_shard(path: str, batch_size: int) -> int:
+    """Copy a shard's worlds into storyworlds in batches of `batch_size`; returns how many."""
+    shard = sqlite3.connect(path)
+    merged = 0
+    try:
+        cursor = shard.execute(f"SELECT {', '.join(SHARD_COLUMNS + SHARD_NAME_COLUMNS)} FROM worlds ORDER BY rowid")
+        with SessionLocal() as db:
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+                rows, entries, deltas = [], [], Counter()
+                for world_id, values in zip(id_allocator.reserve(db, len(batch)), batch):
+                    row = {column: value for column, value in zip(SHARD_COLUMNS, values) if value is not None}
+                    row["id"] = world_id
+                    row["created_at"] = created_at
+                    rows.append(row)
+                    if SEARCH_INDEX_ENABLED:
+                        entries.append(search_entry(
+                            world_id, row["title"], row["summary"], row["theme"],
+                            orjson.loads(values[-2]), orjson.loads(values[-1])
+                        ))
+                    deltas[(row["genre"], row["complexity"])] += 1
+                write_storyworld_rows(db, rows, entries, deltas)
+                merged += len(rows)
+    finally:
+        shard.close()
+    return merged
+
+def generate_cli(args) -> None:
+    """Generate `args.count` worlds across worker processes and store them, bypassing HTTP."""
+    if args.engine == "numpy" and load_numpy() is None:
+        raise SystemExit("--engine numpy needs numpy installed (pip install numpy)")
+    genres = [args.genre] if args.genre else list(template_registry.genres)
+    for genre in genres:
+        StoryRequest(theme=args.theme, genre=genre, complexity=args.complexity)  # fail fast on bad options
+    seed = args.seed if args.seed is not None else random.SystemRandom().randrange(2 ** 32)
+    workers = max(1, min(args.workers, args.count))
+    shard_dir = tempfile.mkdtemp(prefix="storyworld-shards-")
+    
+    start = time.perf_counter()
+    merged = 0
+    try:
+        if settings.storage_mode == "compact":
+            template_codecs.current()  # register the template version once, before forking
+        # Workers never share the parent's pooled connections
+        with ProcessPoolExecutor(max_workers=workers, initializer=engine.dispose, initargs=(False,)) as pool:
+            futures = {}
+            for worker in range(workers):
+                first = args.count * worker // workers
+                count = args.count * (worker + 1) // workers - first
+                path = os.path.join(shard_dir, f"shard-{worker}.db")
+                future = pool.submit(
+                    generate_shard, path, first, count, args.theme, genres, args.complexity, seed, args.batch_size, args.engine
+                )
+                futures[future] = path
+            # Merge shards as they finish, while the remaining workers keep generating
+            for future in as_completed(futures):
+                future.result()
+                merged += merge_shard(futures[future], args.batch_size)
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+    elapsed = time.perf_counter() - start
+    print(f"Generated {merged} worlds with {workers} workers in {elapsed:.2f}s "
+          f"({merged / elapsed:.0f} worlds/s, seed {seed})")
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=settings.app_name)
+    commands = parser.add_subparsers(dest="command")
+    serve = commands.add_parser("serve", help="Run the API server (default)")
+    serve.add_argument("--no-migrate", action="store_true", help="Skip migrations (when `migrate` runs as its own deploy step)")
+    commands.add_parser("migrate", help="Create missing tables and apply pending migrations")
+    export = commands.add_parser("export", help="Stream stored worlds as NDJSON")
+    export.add_argument("-o", "--output", default="-", help="Output file (default: stdout)")
+    export.add_argument("--genre")
+    export.add_argument("--complexity")
+    export.add_argument("--theme-prefix")
+    export.add_argument("--created-after", type=datetime.fromisoformat)
+    export.add_argument("--created-before", type=datetime.fromisoformat)
+    generate = commands.add_parser("generate", help="Generate worlds straight into the database, without HTTP")
+    generate.add_argument("count", type=int, help="Number of worlds to generate")
+    generate.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    generate.add_argument("--theme", default="an uncharted world")
+    generate.add_argument("--genre", help="Default: cycle through every genre")
+    generate.add_argument("--complexity", default="medium")
+    generate.add_argument("--seed", type=int, help="World i uses seed SEED + i (default: random)")
+    generate.add_argument("--batch-size", type=int, default=1000, help="Worlds per shard write and per merge transaction")
+    generate.add_argument("--engine", choices=("python", "numpy"), default="python",
+                          help="numpy: vectorized draws per batch (faster; output also depends on --workers)")
+    args = parser.parse_args(argv)
+    if args.command in (None, "serve") and settings.write_behind and settings.workers > 1:
+        # Pending worlds live in one process's queue: another worker would
+        # answer 404 for them until the batch commits, and DELETE would miss them
+        raise SystemExit("WRITE_BEHIND=true needs WORKERS=1 (pending worlds are only visible to the worker that queued them)")
+    
+    configure_logging()
+    if not getattr(args, "no_migrate", False):
+        run_migrations(engine)
+    if args.command == "migrate":
+        return
+    if args.command == "export":
+        export_cli(args)
+        return
+    if args.command == "generate":
+        generate_cli(args)
+        return
+    
     import uvicorn
-#<<<<<<< HEAD
-    logger.info(f"Starting {settings.app_name} v{settings.version}")
-    uvicorn.run(app, host=settings.host, port=settings.port)
-#=======
-    uvicorn.run(app, host="0.0.0.0", port=8000)
-#>>>>>>> 81965c19a440e7736f2962c03e7391a639afab7e
+    logger.info("Starting %s v%s", settings.app_name, settings.version)
+    if settings.workers <= 1:
+        # log_config=None keeps uvicorn's records on our queued handlers
+        uvicorn.run(app, host=settings.host, port=settings.port, log_config=None, access_log=settings.access_log)
+        return
+    
+    # Migrations already ran in this process, so workers start against an
+    # up-to-date schema and must not race to run them again. Hand over to the
+    # uvicorn CLI rather than uvicorn.run(workers=...): spawned workers would
+    # otherwise re-execute this script as __mp_main__ on top of importing main:app.
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="storyworld-metrics-")
+    os.environ["AUTO_MIGRATE"] = "false"
+    logger.info("Starting %d workers", settings.workers)
+    log_listener.stop()  # flush queued records; exec skips atexit handlers
+    os.execv(sys.executable, [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+        "--host", settings.host, "--port", str(settings.port), "--workers", str(settings.workers),
+        *([] if settings.access_log else ["--no-access-log"])
+    ])
+
+if __name__ == "__main__":
+    main()
@@ -70,6 +70,7 @@ function WorldForm({ theme, setTheme, genre, setGenre, complexity, setComplexity
                   <option value="simple" className="bg-gray-900">Simple</option>
                   <option value="medium" className="bg-gray-900">Medium</option>
                   <option value="complex" className="bg-gray-900">Complex</option>
+                  <option value="epic" className="bg-gray-900">Epic</option>
                 </select>
                 <div className="absolute right-4 top-1/2 -translate-y-1/2 pointer-events-none text-gray-400">
                   <svg className="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24">